@@ -26,9 +26,8 @@ if __name__ == "__main__":
     from ctc.data_models.families import RevitFamily
     from ctc.data_models.elements import RevitElement
     from ctc.api_sessions import get_active_session
-    from ctc.api_categories import get_categories
-    from ctc.api_famlies import get_families
-    from ctc.api_elements import get_elements
+    from ctc.client import close_clients
+    from ctc.crawler import crawl_project, print_progress
     from datetime import datetime
     from ctc.data_models.parameters import ParameterSimple
 
@@ -38,34 +37,21 @@ if __name__ == "__main__":
     # print(read_file_json("data/definitions.json"))
     # print(read_file_csv("ctc/Category_2025.csv"))
     session = asyncio.run(get_active_session())
-    project: RevitCategories = asyncio.run(get_categories())
 
-    for category in project.Categories:
-        # Get the families for the category
-        result_val = asyncio.run(
-            get_families(
-                session=session,
-                category=category,
-            )
-        )
-        c = project.get_category_index(category)
-        project.Categories[c] = result_val["result"]
+    async def crawl() -> RevitCategories:
+        try:
+            return await crawl_project(session, on_progress=print_progress)
+        finally:
+            await close_clients()
 
-        # Get the elements for the category
-        result_val = asyncio.run(
-            get_elements(
-                session=session,
-                category=category,
-            )
-        )
-        project.Categories[c] = result_val["result"]
+    project = asyncio.run(crawl())
 
     category_doors = project.get_category_by_name("doors")
     # door_param_list = category_doors.get_parameter_list()
     # print(category.model_dump())
     sub_folder = datetime.now().strftime("%Y%m%d")
     write_file_json(
-        stream=project.model_dump(),
+        stream=project.snapshot(),
         file_name=f"{session.Port}_{session.RevitVersion}_{session.ActiveProject}",
         folder=f"{sub_folder}",
     )
@@ -0,0 +1 @@
+"""Initialization of parent folder as python module"""
@@ -0,0 +1,62 @@
+"""Benchmark: get_categories parsing the csv per call vs the compiled catalog
+
+Run from the repository root:
+    python -m benchmarks.bench_catalog
+"""
+
+import asyncio
+import csv
+import os
+import time
+
+from ctc import catalog
+from ctc.api_categories import get_categories
+from ctc.data_models.categories import RevitCategories, RevitCategory
+
+CALLS = 200
+
+
+def csv_categories() -> RevitCategories:
+    """The per-call csv parsing get_categories used to do"""
+    with open(catalog.catalog_path(), "r") as open_file:
+        categories = RevitCategories()
+        for row in csv.DictReader(open_file):
+            if row["IsObsolete"] == "FALSE" and row["ForLLM"] == "TRUE":
+                categories.add_category(RevitCategory.model_validate(row))
+    return categories
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    path = catalog.catalog_path()
+    if os.path.exists(path + catalog.CACHE_SUFFIX):
+        os.remove(path + catalog.CACHE_SUFFIX)
+    catalog._catalogs.clear()
+    compile_ms = timed(catalog.get_catalog) * 1000
+    catalog._catalogs.clear()
+    cache_ms = timed(catalog.get_catalog) * 1000
+
+    parse = sum(timed(csv_categories) for _ in range(CALLS)) / CALLS
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        await get_categories()
+    compiled = (time.perf_counter() - start) / CALLS
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        catalog.get_catalog().get("OST_Doors")
+    lookup = (time.perf_counter() - start) / CALLS
+
+    print(f"first call, compile csv: {compile_ms:.1f} ms")
+    print(f"first call, disk cache: {cache_ms:.1f} ms")
+    print(f"csv parse per call: {parse * 1e6:,.0f} us")
+    print(f"get_categories per call: {compiled * 1e6:,.0f} us")
+    print(f"catalog lookup per call: {lookup * 1e6:,.1f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
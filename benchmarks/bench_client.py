@@ -0,0 +1,96 @@
+"""Benchmark: fresh aiohttp session per call vs the pooled CTC client on a crawl
+
+Run from the repository root:
+    python -m benchmarks.bench_client
+"""
+
+import asyncio
+import time
+
+import aiohttp
+
+from benchmarks.fake_ctc import sample_elements, server_port, start_server
+from ctc.client import close_clients, get_client
+from ctc.api_elements import get_elements
+from ctc.data_models.categories import RevitCategory
+from ctc.data_models.sessions import RevitSession
+from ctc.settings import CTCSettings
+
+CATEGORIES = 300
+
+
+def make_category(i: int) -> RevitCategory:
+    return RevitCategory.model_validate(
+        {
+            "ID": str(-2000000 - i),
+            "DisplayName": f"Category {i}",
+            "IsFamilyInstanceCreatable": True,
+            "IsAnnotation": False,
+            "IsFamilyFileCreatable": True,
+            "IsVirtual": False,
+        }
+    )
+
+
+async def crawl_fresh_sessions(port: int) -> float:
+    """The pre-pool pattern, one ClientSession (and TCP connect) per call"""
+    start = time.perf_counter()
+    for i in range(CATEGORIES):
+        async with aiohttp.ClientSession() as session:
+            url = f"http://localhost:{port}/api/v1/elements"
+            params = {"apiKey": "bench", "categoryId": str(-2000000 - i)}
+            async with session.get(url, params=params) as response:
+                await response.json()
+    return time.perf_counter() - start
+
+
+async def crawl_pooled(port: int) -> float:
+    """Same calls on the pooled client, connections are kept alive"""
+    start = time.perf_counter()
+    for i in range(CATEGORIES):
+        client = get_client(port)
+        url = client.url("/api/v1/elements")
+        params = {"apiKey": "bench", "categoryId": str(-2000000 - i)}
+        async with client.session.get(url, params=params) as response:
+            await response.json()
+    return time.perf_counter() - start
+
+
+async def crawl_get_elements(port: int) -> float:
+    """get_elements end to end on the pooled client, includes model validation"""
+    rvt_session = RevitSession(RevitVersion="2025", Port=port)
+    settings = CTCSettings(ApiKey="bench", RevitPort=port)
+    start = time.perf_counter()
+    for i in range(CATEGORIES):
+        await get_elements(
+            session=rvt_session, category=make_category(i), settings=settings
+        )
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    runner = await start_server(
+        {
+            "/api/v1/elements": lambda request: sample_elements(
+                request.query["categoryId"], count=5
+            )
+        }
+    )
+    port = server_port(runner)
+    try:
+        fresh = await crawl_fresh_sessions(port)
+        pooled = await crawl_pooled(port)
+        elements = await crawl_get_elements(port)
+    finally:
+        await close_clients()
+        await runner.cleanup()
+
+    print(f"categories crawled:    {CATEGORIES}")
+    print(f"fresh session / call:  {fresh * 1000 / CATEGORIES:.3f} ms per call")
+    print(f"pooled client:         {pooled * 1000 / CATEGORIES:.3f} ms per call")
+    print(f"speed up:              {fresh / pooled:.2f}x")
+    print(f"get_elements (pooled): {elements * 1000 / CATEGORIES:.3f} ms per call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
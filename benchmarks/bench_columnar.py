@@ -0,0 +1,117 @@
+"""Benchmark: memory, filter and aggregate time of the model tree vs columns
+
+Memory of the tree is the resident memory it adds, measured in a separate
+process; memory of the columns is the bytes held by their arrays and tables.
+Run from the repository root:
+    python -m benchmarks.bench_columnar
+"""
+
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_client import make_category
+from benchmarks.fake_ctc import sample_elements
+from ctc.api_elements import add_element
+from ctc.data_models.categories import RevitCategory
+from ctc.data_models.columnar import ElementColumns
+
+ELEMENTS = 20_000
+PARAMETERS = 40
+
+
+def rss_mb() -> float:
+    """Peak resident memory of this process (ru_maxrss is KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def sample_payload() -> list:
+    """Elements with string, integer, double and element id parameters"""
+    elements = sample_elements("-2000000", ELEMENTS, PARAMETERS)
+    for i, element in enumerate(elements):
+        for parameter in element["parameters"]:
+            match parameter["id"] % 4:
+                case 1:
+                    parameter.update(storageType="Integer", valueAsInt=i % 10)
+                case 2:
+                    parameter.update(storageType="Double", valueAsDouble=i * 0.25)
+                case 3:
+                    parameter.update(storageType="ElementId", valueAsElementId=i % 50)
+    return elements
+
+
+def build_category(elements: list) -> RevitCategory:
+    category = make_category(0)
+    for element in elements:
+        add_element(category, element)
+    return category
+
+
+def tree_filter_sum(category: RevitCategory) -> tuple:
+    """Elements whose Param 1 is 3, and the sum of their Param 2 per type"""
+    sums = {}
+    for family in category.Families:
+        for type in family.Types:
+            for element in type.Instances:
+                values = {p.Name: p.Value for p in element.Parameters}
+                if values.get("Param 1") == 3:
+                    sums[type.Name] = sums.get(type.Name, 0.0) + values["Param 2"]
+    return sums
+
+
+def column_filter_sum(columns: ElementColumns) -> dict:
+    mask = columns.column("Param 1").equals(3)
+    values = columns.column("Param 2").numeric().filled(0.0)
+    sums = np.bincount(
+        columns.type_index[mask], weights=values[mask], minlength=len(columns.types)
+    )
+    return {columns.types[i].Name: s for i, s in enumerate(sums) if s}
+
+
+def measure_tree() -> None:
+    elements = sample_payload()
+    baseline = rss_mb()
+    category = build_category(elements)
+    print(f"{rss_mb() - baseline:.1f} {len(category.Families)}")
+
+
+def main() -> None:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_columnar", "tree"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    tree_mb = float(output.split()[0])
+
+    category = build_category(sample_payload())
+    start = time.perf_counter()
+    columns = ElementColumns.from_category(category)
+    convert = time.perf_counter() - start
+    columns_mb = columns.nbytes / 2**20
+
+    start = time.perf_counter()
+    tree_result = tree_filter_sum(category)
+    tree_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    column_result = column_filter_sum(columns)
+    column_seconds = time.perf_counter() - start
+    assert tree_result == column_result
+
+    print(f"elements: {ELEMENTS} x {PARAMETERS} parameters")
+    print(f"memory:   tree {tree_mb:.1f} MB, columns {columns_mb:.1f} MB")
+    print(
+        f"filter+sum: tree {tree_seconds * 1000:.1f} ms, "
+        f"columns {column_seconds * 1000:.2f} ms"
+    )
+    print(f"conversion: {convert:.2f}s from the tree")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        measure_tree()
+    else:
+        main()
@@ -0,0 +1,72 @@
+"""Benchmark: merging elements into a category, indexed lookups vs list scans
+
+Run from the repository root:
+    python -m benchmarks.bench_merge
+"""
+
+import time
+
+from benchmarks.bench_client import make_category
+from benchmarks.fake_ctc import sample_elements
+from ctc.api_elements import add_element
+from ctc.data_models.categories import RevitCategory
+from ctc.data_models.elements import RevitElement
+from ctc.data_models.families import RevitFamily
+from ctc.data_models.family_types import RevitFamilyType
+
+SIZES = [1_000, 10_000, 100_000]
+SCAN_LIMIT = 10_000  # the quadratic merge takes minutes past this
+
+
+def same(a, b) -> bool:
+    return a.Id == b.Id and a.Name == b.Name
+
+
+def scan_merge(category: RevitCategory, element: dict) -> None:
+    """The previous merge, every has_* / get_*_index call scanned its list"""
+    family = RevitFamily.model_validate(element["type"]["family"])
+    family_type = RevitFamilyType.model_validate(element["type"])
+    model = RevitElement.model_validate(element)
+
+    families = category.Families
+    fam_i = next((i for i, f in enumerate(families) if same(f, family)), -1)
+    if fam_i == -1:
+        families.append(family)
+        fam_i = len(families) - 1
+    types = families[fam_i].Types
+    type_i = next((i for i, t in enumerate(types) if same(t, family_type)), -1)
+    if type_i == -1:
+        types.append(family_type)
+        type_i = len(types) - 1
+    instances = types[type_i].Instances
+    elem_i = next((i for i, e in enumerate(instances) if same(e, model)), -1)
+    if elem_i == -1:
+        instances.append(model)
+    else:
+        instances[elem_i] = model
+
+
+def time_merge(merge, elements: list) -> float:
+    category = make_category(0)
+    start = time.perf_counter()
+    for element in elements:
+        merge(category, element)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    print(f"{'elements':>9} {'indexed':>10} {'us/elem':>8} {'scan':>10} {'us/elem':>8}")
+    for size in SIZES:
+        elements = sample_elements("-2000000", size, parameters=2)
+        indexed = time_merge(add_element, elements)
+        line = f"{size:>9} {indexed:>9.2f}s {indexed / size * 1e6:>8.1f}"
+        if size <= SCAN_LIMIT:
+            scan = time_merge(scan_merge, elements)
+            line += f" {scan:>9.2f}s {scan / size * 1e6:>8.1f}"
+        else:
+            line += f" {'skipped':>10}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
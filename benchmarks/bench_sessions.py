@@ -0,0 +1,67 @@
+"""Benchmark: serial vs concurrent session discovery with slow and dead Revit ports
+
+Run from the repository root:
+    python -m benchmarks.bench_sessions
+"""
+
+import asyncio
+import socket
+import time
+
+from benchmarks.fake_ctc import server_port, start_server
+from ctc.api_sessions import get_active_model, probe_sessions
+from ctc.client import close_clients
+from ctc.data_models.sessions import RevitSession, RevitSessions
+from ctc.response_cache import response_cache
+from ctc.settings import get_settings
+
+SLOW_DELAY = 2.0
+PROBE_TIMEOUT = 0.5
+
+
+def free_port() -> int:
+    """A port nothing is listening on, probes to it are refused"""
+    with socket.socket() as sock:
+        sock.bind(("localhost", 0))
+        return sock.getsockname()[1]
+
+
+def make_sessions(ports: list) -> RevitSessions:
+    return RevitSessions(
+        Sessions=[RevitSession(RevitVersion="2025", Port=port) for port in ports]
+    )
+
+
+async def main() -> None:
+    get_settings().update(ApiKey="bench")
+    routes = {"/api/v1/projects/active": lambda request: {"title": "Project"}}
+    healthy = [await start_server(routes) for _ in range(2)]
+    slow = [await start_server(routes, delay=SLOW_DELAY) for _ in range(2)]
+    ports = [server_port(r) for r in healthy + slow] + [free_port(), free_port()]
+
+    try:
+        # Previous behaviour, one probe after the other without a deadline
+        start = time.perf_counter()
+        for session in make_sessions(ports).Sessions:
+            await get_active_model(session)
+        serial = time.perf_counter() - start
+
+        # Nothing the serial pass fetched may answer the concurrent one
+        response_cache.clear()
+        start = time.perf_counter()
+        sessions = await probe_sessions(make_sessions(ports), PROBE_TIMEOUT)
+        concurrent = time.perf_counter() - start
+    finally:
+        await close_clients()
+        for runner in healthy + slow:
+            await runner.cleanup()
+
+    print(f"sessions:   {len(ports)} (2 healthy, 2 slow {SLOW_DELAY}s, 2 dead)")
+    print(f"serial:     {serial:.2f}s")
+    print(f"concurrent: {concurrent:.2f}s (probe timeout {PROBE_TIMEOUT}s)")
+    for session in sessions.Sessions:
+        print(f"  port {session.Port}: reachable={session.Reachable}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""Benchmark: json snapshot vs binary snapshot, size and time to open one category
+
+The json file has to be parsed whole before any category can be read; the
+binary snapshot reads the manifest and maps one category file.
+Run from the repository root:
+    python -m benchmarks.bench_snapshot
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_client import make_category
+from benchmarks.bench_columnar import sample_payload
+from ctc.api_elements import add_element
+from ctc.data_models.categories import RevitCategories
+from ctc.snapshot import JSON_FILE, Snapshot, write_snapshot
+
+CATEGORIES = 10
+
+
+def build_project(elements: list) -> RevitCategories:
+    project = RevitCategories()
+    for i in range(CATEGORIES):
+        category = make_category(i)
+        for element in elements[i::CATEGORIES]:
+            add_element(category, element)
+        project.add_category(category)
+    return project
+
+
+def folder_bytes(path: str, skip: str = "") -> int:
+    return sum(
+        os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if f != skip
+    )
+
+
+def main() -> None:
+    elements = sample_payload()
+    project = build_project(elements)
+    target = project.Categories[-1].Id
+    print(f"{CATEGORIES} categories, {len(elements)} elements")
+
+    with tempfile.TemporaryDirectory() as path:
+        start = time.perf_counter()
+        write_snapshot(project, path)
+        binary_write = time.perf_counter() - start
+        binary_bytes = folder_bytes(path)
+
+        start = time.perf_counter()
+        with open(os.path.join(path, JSON_FILE), "w") as f:
+            json.dump(project.snapshot(), f, indent=4)
+        json_write = time.perf_counter() - start
+        json_bytes = os.path.getsize(os.path.join(path, JSON_FILE))
+
+        start = time.perf_counter()
+        with open(os.path.join(path, JSON_FILE), "r") as f:
+            dump = json.load(f)
+        next(c for c in dump["Categories"] if c["Id"] == target)
+        json_open = time.perf_counter() - start
+
+        start = time.perf_counter()
+        columns = Snapshot(path).columns(target)
+        binary_open = time.perf_counter() - start
+
+        start = time.perf_counter()
+        Snapshot(path).category(target)
+        binary_tree = time.perf_counter() - start
+
+    print(f"  json: {json_bytes / 1e6:.1f} MB, write {json_write:.2f}s")
+    print(f"binary: {binary_bytes / 1e6:.1f} MB, write {binary_write:.2f}s")
+    print(f"open one category, json parse: {json_open * 1000:.0f} ms")
+    print(
+        f"open one category, binary columns: {binary_open * 1000:.1f} ms "
+        f"({len(columns)} elements)"
+    )
+    print(f"open one category, binary model tree: {binary_tree * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark: peak memory of buffered vs streamed element ingestion
+
+Each mode runs in its own process and reports the peak of the memory
+allocated during ingestion, traced with tracemalloc; timings are taken with
+tracing on, so they compare the modes rather than give absolute speed.
+Run from the repository root:
+    python -m benchmarks.bench_streaming
+"""
+
+import asyncio
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from aiohttp import web
+
+from benchmarks.bench_client import make_category
+from benchmarks.fake_ctc import sample_elements
+from ctc.api_elements import get_elements
+from ctc.client import close_clients
+from ctc.data_models.sessions import RevitSession
+from ctc.settings import CTCSettings
+
+ELEMENTS = 5000
+PARAMETERS = 40
+
+
+async def serve(body: bytes) -> web.AppRunner:
+    """Fake server returning a pre-serialised body, so it adds no peak of its own"""
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=body, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/api/v1/elements", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "localhost", 0).start()
+    return runner
+
+
+async def ingest(stream: bool) -> None:
+    body = json.dumps(
+        sample_elements("-2000000", count=ELEMENTS, parameters=PARAMETERS)
+    ).encode()
+    runner = await serve(body)
+    port = runner.addresses[0][1]
+    category = make_category(0)
+    # Trace from here, the payload and the server are not part of the peak
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        response = await get_elements(
+            session=RevitSession(RevitVersion="2025", Port=port),
+            category=category,
+            settings=CTCSettings(ApiKey="bench", RevitPort=port),
+            stream=stream,
+        )
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        await close_clients()
+        await runner.cleanup()
+
+    assert response["success"], response.get("error")
+    instances = sum(f.InstanceCount for f in category.Families)
+    name = "streamed" if stream else "buffered"
+    print(
+        f"{name}: {seconds:.2f}s, {instances} instances, "
+        f"peak {peak / 2**20:.1f} MB allocated while ingesting"
+    )
+
+
+def main() -> None:
+    print(f"elements: {ELEMENTS} x {PARAMETERS} parameters")
+    for mode in ("buffered", "streamed"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_streaming", mode],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        print(output.splitlines()[-1])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        asyncio.run(ingest(stream=sys.argv[1] == "streamed"))
+    else:
+        main()
@@ -0,0 +1,55 @@
+"""Benchmark: ingestion throughput with strict validation vs trusted construction
+
+Run from the repository root:
+    python -m benchmarks.bench_trusted
+"""
+
+import gc
+import time
+
+from benchmarks.bench_client import make_category
+from benchmarks.fake_ctc import sample_elements
+from ctc.api_elements import add_element
+from ctc.settings import CTCSettings
+
+ELEMENTS = 20_000
+PARAMETERS = 20
+TYPE_PARAMETERS = 10
+
+MODES = {
+    "strict": CTCSettings(TrustedIngest=True, StrictValidation=True),
+    "trusted, 1% validated": CTCSettings(TrustedIngest=True, ValidateSample=0.01),
+    "trusted, none validated": CTCSettings(TrustedIngest=True, ValidateSample=0.0),
+}
+
+
+def sample_payload() -> list:
+    """Elements whose nested type carries its type parameters, as the api sends"""
+    elements = sample_elements("-2000000", ELEMENTS, PARAMETERS)
+    for element in elements:
+        element["type"]["parameters"] = element["parameters"][:TYPE_PARAMETERS]
+    return elements
+
+
+def ingest(elements: list, settings: CTCSettings) -> float:
+    gc.collect()
+    category = make_category(0)
+    start = time.perf_counter()
+    for element in elements:
+        add_element(category, element, trusted=settings.trust_element())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    elements = sample_payload()
+    print(
+        f"elements: {ELEMENTS} x {PARAMETERS} parameters, "
+        f"{TYPE_PARAMETERS} type parameters"
+    )
+    for name, settings in MODES.items():
+        seconds = ingest(elements, settings)
+        print(f"{name:>24}: {seconds:.2f}s, {ELEMENTS / seconds:,.0f} elements/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Fake CTC API server used by the benchmarks, serves canned json on localhost"""
+
+import asyncio
+from typing import Any, Callable, Dict
+
+from aiohttp import web
+
+
+# Functions
+def sample_elements(category_id: str, count: int = 20, parameters: int = 5) -> list:
+    """Builds an /api/v1/elements payload shaped like the CTC response"""
+    elements = []
+    for i in range(count):
+        elements.append(
+            {
+                "id": int(f"{abs(int(category_id))}{i:05d}"),
+                "name": f"Element {i}",
+                "type": {
+                    "id": i % 4,
+                    "name": f"Type {i % 4}",
+                    "family": {"id": i % 2, "name": f"Family {i % 2}"},
+                },
+                "parameters": [
+                    {
+                        "id": p,
+                        "name": f"Param {p}",
+                        "hasValue": True,
+                        "isShared": False,
+                        "isReadOnly": False,
+                        "storageType": "String",
+                        "valueAsString": f"{i}-{p}",
+                    }
+                    for p in range(parameters)
+                ],
+            }
+        )
+    return elements
+
+
+async def start_server(
+    routes: Dict[str, Callable[[web.Request], Any]],
+    delay: float = 0.0,
+) -> web.AppRunner:
+    """Starts the fake server on a free port, returns the runner.
+    routes maps a path to a function returning the json body for a request."""
+    app = web.Application()
+
+    def make_handler(build):
+        async def handler(request: web.Request) -> web.Response:
+            if delay:
+                await asyncio.sleep(delay)
+            return web.json_response(build(request))
+
+        return handler
+
+    for path, build in routes.items():
+        app.router.add_route("*", path, make_handler(build))
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "localhost", 0)
+    await site.start()
+    return runner
+
+
+def server_port(runner: web.AppRunner) -> int:
+    """Port the fake server is listening on"""
+    return runner.addresses[0][1]
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -7,6 +7,7 @@ from core.tool_models import (
     ToolCall,
     ToolManager,
 )
+from ctc.client import close_clients
 from ctc.api_sessions import (
     get_sessions,
     get_active_session,
@@ -15,9 +16,18 @@ from ctc.api_sessions import (
 from ctc.api_categories import (
     get_categories,
 )
+from ctc.api_names import (
+    resolve_name,
+)
 from ctc.api_elements import (
-    get_elements,
+    get_category_elements,
     get_element_details,
+    get_elements_details,
+    refresh_category_elements,
+)
+from ctc.api_query import (
+    get_category_summary,
+    query_elements,
 )
 from ctc.api_projects import (
     get_active_project,
@@ -29,6 +39,7 @@ from ctc.api_views import (
     get_views,
     get_view_templates,
     create_floor_plan,
+    create_floor_plans,
 )
 from core.openai_functions import (
     ChatMessage,
@@ -53,11 +64,18 @@ async def main(initialize_only=False):
         "get_active_project": get_active_project,
         "get_views": get_views,
         "get_categories": get_categories,
+        "resolve_name": resolve_name,
         "get_levels": get_levels,
         "get_view_templates": get_view_templates,
         "create_floor_plan": create_floor_plan,
-        "get_elements": get_elements,
+        "create_floor_plans": create_floor_plans,
+        "get_elements": get_category_elements,
         "get_element_details": get_element_details,
+        "get_elements_details": get_elements_details,
+        "refresh_elements": refresh_category_elements,
+        "query_elements": query_elements,
+        "get_category_summary": get_category_summary,
+        "fetch_more": tool_manager.results.fetch_more,
     }
 
     # Register all tools at once
@@ -131,6 +149,9 @@ async def main(initialize_only=False):
         else:
             print(f"Assistant response: {response.content}")
 
+        # The pooled Revit clients belong to this loop
+        await close_clients()
+
 
 # Prevent running from this file
 if __name__ == "__main__":
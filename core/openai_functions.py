@@ -1,6 +1,5 @@
 """OpenAI Chat Engine Functions"""
 
-import os
 import logging
 from enum import Enum
 from typing import List, Dict, Any, Optional
@@ -11,6 +10,7 @@ from core.tool_models import (
     ToolManager,
     FunctionCall,
 )
+from ctc.settings import get_settings
 
 # Classes for Open AI chat engine
 
@@ -69,7 +69,7 @@ class OpenAIClient:
 
         message = response.choices[0].message
 
-        logging.info(f"Revit Port: {os.environ.get('REVIT_PORT')}")
+        logging.info(f"Revit Port: {get_settings().RevitPort}")
         function_call = None
         if message.function_call:
             function_call = FunctionCall(
@@ -0,0 +1,219 @@
+"""Result sizing for tool calls, large results are paged behind a cursor
+
+A tool result whose json exceeds the page size is split into sections, each a
+part of the result addressed by its path (e.g. result.Families[0].Types with
+the Offset of its first item), and the sections are packed into pages. The
+first page goes into the prompt with the cursor, the rest are kept here and
+returned one page at a time by the fetch_more tool.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+
+# Largest tool result put into the prompt, in json bytes (~4 per token)
+MAX_RESULT_CHARS = 12000
+# Bytes kept for the page fields around the sections
+PAGE_OVERHEAD = 400
+# Bytes kept for the Path and Offset of a section
+SECTION_OVERHEAD = 200
+# Paged results kept for fetch_more, the oldest is dropped first
+MAX_STORED_RESULTS = 16
+# Placeholder of a value sent in its own sections
+PAGED_VALUE = "<paged>"
+
+
+# Class Definitions
+class ResultSection(BaseModel):
+    """A part of a paged result, Offset is the index of the first item when
+    the section holds part of a list, or of the first character when it holds
+    part of a string"""
+
+    Path: str
+    Offset: Optional[int] = None
+    Value: Any
+
+
+class ResultPage(BaseModel):
+    """One page of a paged result and the size of the whole result"""
+
+    Cursor: str
+    Page: int
+    Pages: int
+    TotalBytes: int  # json bytes of the whole result
+    Sections: List[ResultSection]
+
+
+class ResultStore:
+    """Paged tool results by cursor"""
+
+    def __init__(
+        self,
+        max_chars: int = MAX_RESULT_CHARS,
+        max_results: int = MAX_STORED_RESULTS,
+    ):
+        self.max_chars = max_chars
+        self.max_results = max_results
+        self._results: OrderedDict[str, Tuple[int, List[List[ResultSection]]]] = (
+            OrderedDict()
+        )
+        self._count = 0
+
+    def size(self, name: str, response: BaseModel) -> BaseModel:
+        """The response as is when it fits a page, else a copy holding the first
+        page of its result"""
+        total = _size(response.result)
+        if total <= self.max_chars:
+            return response
+        result = to_jsonable_python(response.result, by_alias=False)
+        budget = max(self.max_chars - PAGE_OVERHEAD, 1)
+        sections = split(result, "result", max(budget - SECTION_OVERHEAD, 1), total)
+        pages = paginate(sections, budget)
+        self._count += 1
+        cursor = f"{name}-{self._count}"
+        self._results[cursor] = (total, pages)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+        return response.model_copy(update={"result": self.page(cursor, 1)})
+
+    def page(self, cursor: str, page: int) -> Optional[ResultPage]:
+        """Page of a stored result, numbered from 1, None when unknown"""
+        stored = self._results.get(cursor)
+        if stored is None or not 1 <= page <= len(stored[1]):
+            return None
+        total, pages = stored
+        return ResultPage(
+            Cursor=cursor,
+            Page=page,
+            Pages=len(pages),
+            TotalBytes=total,
+            Sections=pages[page - 1],
+        )
+
+    async def fetch_more(self, Cursor: str, Page: int = 2) -> Dict[str, Any]:
+        """Tool entry point, a further page of a result paged by its cursor"""
+        stored = self._results.get(Cursor)
+        if stored is None:
+            return {"success": False, "error": f"Unknown or expired cursor {Cursor}"}
+        page = self.page(Cursor, int(Page))
+        if page is None:
+            return {
+                "success": False,
+                "error": f"Page {Page} out of range, {Cursor} has {len(stored[1])}",
+            }
+        return {"success": True, "result": page}
+
+
+# Functions
+def split(
+    value: Any, path: str, budget: int, size: Optional[int] = None
+) -> List[ResultSection]:
+    """Sections of at most budget bytes covering the value. Lists are
+    cut into runs of items, dicts into runs of entries, and a value too large
+    for one section gets its own sections under its path"""
+    if size is None:
+        size = _size(value)
+    if size <= budget:
+        return [ResultSection(Path=path, Value=value)]
+    if isinstance(value, list):
+        return _split_items(
+            list(enumerate(value)), path, budget, lambda i: f"{path}[{i}]"
+        )
+    if isinstance(value, dict):
+        return _split_items(
+            list(value.items()), path, budget, lambda k: f"{path}.{k}", is_dict=True
+        )
+    # A string longer than a page is sent in parts, numbers never get here
+    return _split_string(str(value), path, budget)
+
+
+def _split_items(
+    items: List[Tuple[Any, Any]],
+    path: str,
+    budget: int,
+    child_path,
+    is_dict: bool = False,
+) -> List[ResultSection]:
+    """Runs of the items of a list or dict, the items over budget split apart.
+    Dict entries sent apart keep a placeholder in the first run"""
+    runs: List[ResultSection] = []
+    nested: List[ResultSection] = []
+    run: Dict[Any, Any] = {}
+    run_size = 2
+    start = 0
+    for key, item in items:
+        item_size = _size(item) + (_size(str(key)) + 1 if is_dict else 0)
+        if item_size > budget:
+            nested.extend(split(item, child_path(key), budget, item_size))
+            if not is_dict:
+                # The run ends here so the Offset of the next one stays right
+                if run:
+                    runs.append(_section(path, run, start, is_dict))
+                    run, run_size = {}, 2
+                continue
+            item, item_size = PAGED_VALUE, _size(str(key)) + len(PAGED_VALUE) + 3
+        if run and run_size + item_size + 1 > budget:
+            runs.append(_section(path, run, start, is_dict))
+            run, run_size = {}, 2
+        if not run:
+            start = key
+        run[key] = item
+        run_size += item_size + 1
+    if run:
+        runs.append(_section(path, run, start, is_dict))
+    # Parent runs first so a placeholder comes before the sections it stands for
+    return runs + nested
+
+
+def _split_string(value: str, path: str, budget: int) -> List[ResultSection]:
+    """Parts of a string of at most budget json bytes, each with the index of
+    its first character, joined in order they give back the string"""
+    sections = []
+    start = 0
+    while start < len(value):
+        length = max(budget - 2, 1)
+        part = value[start : start + length]
+        # Escapes and non-ascii characters take more than a byte
+        while length > 1 and _size(part) > budget:
+            length = max(min(length - 1, length * budget // _size(part)), 1)
+            part = value[start : start + length]
+        sections.append(ResultSection(Path=path, Offset=start, Value=part))
+        start += length
+    return sections
+
+
+def _section(
+    path: str, run: Dict[Any, Any], start: Any, is_dict: bool
+) -> ResultSection:
+    if is_dict:
+        return ResultSection(Path=path, Value=run)
+    return ResultSection(Path=path, Offset=start, Value=list(run.values()))
+
+
+def paginate(sections: List[ResultSection], budget: int) -> List[List[ResultSection]]:
+    """Sections packed in order into pages of at most budget bytes"""
+    pages: List[List[ResultSection]] = []
+    page: List[ResultSection] = []
+    page_size = 0
+    for section in sections:
+        section_size = len(section.model_dump_json())
+        if page and page_size + section_size + 1 > budget:
+            pages.append(page)
+            page, page_size = [], 0
+        page.append(section)
+        page_size += section_size + 1
+    if page:
+        pages.append(page)
+    return pages
+
+
+def _size(value: Any) -> int:
+    """Length of the compact json of a value, as model_dump_json writes it"""
+    return len(to_json(value, by_alias=False))
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
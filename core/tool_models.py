@@ -5,6 +5,10 @@ from typing import List, Dict, Any, Optional, Callable
 from pydantic import BaseModel
 import logging
 
+from core.result_pages import ResultStore
+from ctc.element_index import ElementIndex
+from utils.name_index import NameIndex
+
 
 # Pydantic Models for Tool Definitions
 class ToolParameter(BaseModel):
@@ -14,6 +18,7 @@ class ToolParameter(BaseModel):
     description: str
     type: str
     required: bool = False
+    items: Optional[Dict[str, Any]] = None  # element schema of array parameters
 
 
 class Tool(BaseModel):
@@ -64,6 +69,11 @@ class ChatMemory:
                 "element": {},  # element_id -> element_data
             }
         }
+        # Fuzzy index of the name to ID mappings, kept current by store_*
+        self.names = NameIndex()
+        # ElementId -> place in the stored category trees, kept current by
+        # store_category_tree
+        self.elements = ElementIndex()
 
     def store_sessions(self, sessions: List[Dict[str, Any]]):
         """Store only name to ID mappings for sessions"""
@@ -76,6 +86,7 @@ class ChatMemory:
             for session in sessions
             if "RevitVersion" in session and "Port" in session
         }
+        self._index_names("sessions")
         self.context_data["sessions_last_updated"] = datetime.now()
 
     def store_session(self, session: Dict[str, Any]):
@@ -112,6 +123,7 @@ class ChatMemory:
             for view in views
             if "name" in view and "id" in view
         }
+        self._index_names("views")
         self.context_data["views_last_updated"] = datetime.now()
 
     def store_categories(self, categories: List[Dict[str, Any]]):
@@ -125,6 +137,7 @@ class ChatMemory:
             for category in categories
             if "name" in category and "id" in category
         }
+        self._index_names("categories")
 
     def store_elements(self, elements: List[Dict[str, Any]]):
         """Store only name to ID mappings for revit elements"""
@@ -137,6 +150,7 @@ class ChatMemory:
             for element in elements
             if "name" in element and "id" in element
         }
+        self._index_names("elements")
 
     def store_element_details(self, element: Dict[str, Any]):
         """Store only name to ID mappings for revit elements"""
@@ -150,6 +164,30 @@ class ChatMemory:
             if "name" in element and "id" in element
         }
 
+    def store_elements_details(self, elements: List[Dict[str, Any]]):
+        """Store the details of many revit elements in one update"""
+        # Store the full element data for reference
+        self.context_data["element"] = elements
+
+        # Store the ID to element mappings
+        self.context_data["name_to_id_mappings"]["element"] = {
+            element["id"]: element for element in elements if "id" in element
+        }
+
+    def drop_element_details(self, element_ids: Any):
+        """Forget the stored details of elements, e.g. after writing to them"""
+        dropped = set(element_ids)
+        mapping = self.context_data["name_to_id_mappings"]["element"]
+        for element_id in dropped:
+            mapping.pop(element_id, None)
+        elements = self.context_data.get("element")
+        if isinstance(elements, list):
+            self.context_data["element"] = [
+                e
+                for e in elements
+                if not (isinstance(e, dict) and e.get("id") in dropped)
+            ]
+
     def store_levels(self, levels: List[Dict[str, Any]]):
         """Store only name to ID mappings for levels"""
         # Store the full level data for reference
@@ -161,6 +199,7 @@ class ChatMemory:
             for level in levels
             if "name" in level and "id" in level
         }
+        self._index_names("levels")
 
     def store_templates(self, templates: List[Dict[str, Any]]):
         """Store only name to ID mappings for templates"""
@@ -173,10 +212,55 @@ class ChatMemory:
             for template in templates
             if "name" in template and "id" in template
         }
+        self._index_names("templates")
+
+    def store_category_tree(self, key: str, category: Any):
+        """Store a fetched category tree, the base of later refreshes"""
+        self.context_data.setdefault("category_trees", {})[key] = category
+        self.elements.replace(key, category)
+        # Columns and summary of the previous tree are stale
+        self.context_data.get("category_columns", {}).pop(key, None)
+        self.context_data.get("category_summaries", {}).pop(key, None)
+
+    def drop_category_tree(self, key: str):
+        """Forget a stored category tree with its columns and summary"""
+        self.context_data.get("category_trees", {}).pop(key, None)
+        self.elements.remove(key)
+        self.context_data.get("category_columns", {}).pop(key, None)
+        self.context_data.get("category_summaries", {}).pop(key, None)
+
+    def get_category_tree(self, key: str) -> Optional[Any]:
+        """Get a stored category tree"""
+        return self.context_data.get("category_trees", {}).get(key)
+
+    def store_category_columns(self, key: str, columns: Any):
+        """Store the columns built from a stored category tree"""
+        self.context_data.setdefault("category_columns", {})[key] = columns
+
+    def get_category_columns(self, key: str) -> Optional[Any]:
+        """Get the columns of a stored category tree"""
+        return self.context_data.get("category_columns", {}).get(key)
+
+    def store_category_summary(self, key: str, summary: Any):
+        """Store the summary of a stored category tree"""
+        self.context_data.setdefault("category_summaries", {})[key] = summary
+
+    def get_category_summary(self, key: str) -> Optional[Any]:
+        """Get the summary of a stored category tree"""
+        return self.context_data.get("category_summaries", {}).get(key)
 
     def get_id_by_name(self, item_type: str, name: str) -> Optional[int]:
-        """Get ID by name for any stored mapping type"""
-        return self.context_data["name_to_id_mappings"].get(item_type, {}).get(name)
+        """Get ID by name for any stored mapping type, ignoring case and
+        punctuation when there is no exact match"""
+        mapping = self.context_data["name_to_id_mappings"].get(item_type, {})
+        if name in mapping:
+            return mapping[name]
+        return self.names.exact(item_type, name)
+
+    def _index_names(self, item_type: str):
+        """Update the fuzzy name index of a stored mapping type"""
+        mapping = self.context_data["name_to_id_mappings"][item_type]
+        self.names.replace(item_type, mapping.items())
 
     def get_sessions(self) -> List[Dict[str, Any]]:
         """Get the stored active revit sessions"""
@@ -222,6 +306,8 @@ class ToolManager:
     def __init__(self):
         self.tools: Dict[str, Tool] = {}
         self.implementations: Dict[str, callable] = {}
+        # Results too large for the prompt, paged out by the fetch_more tool
+        self.results = ResultStore()
 
     def register_tool(self, tool: Tool, implementation: callable):
         """Register a new tool with its implementation"""
@@ -243,6 +329,10 @@ class ToolManager:
                     "type": param.type,
                     "description": param.description,
                 }
+                if param.items:
+                    schema["parameters"]["properties"][param.name][
+                        "items"
+                    ] = param.items
                 if param.required:
                     schema["parameters"]["required"].append(param.name)
             schemas.append(schema)
@@ -269,6 +359,7 @@ class ToolManager:
                     description=param_info.get("description", ""),
                     type=param_info.get("type", "string"),
                     required=param_name in required,
+                    items=param_info.get("items"),
                 )
             )
 
@@ -306,7 +397,9 @@ class ToolManager:
                 f"Executing tool: {tool_call.name} with parameters: {tool_call.parameters}"
             )
             result = await self.implementations[tool_call.name](**tool_call.parameters)
-            return ToolResponse(success=True, result=result)
+            return self.results.size(
+                tool_call.name, ToolResponse(success=True, result=result)
+            )
         except Exception as e:
             return ToolResponse(success=False, result=None, error=str(e))
 
@@ -1,59 +1,50 @@
 """Core functions for CTC Chatbot to get Cateogies from a constants list"""
 
-import os
 from datetime import datetime
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-import aiohttp
+from typing import List, Dict, Any, Optional
 
 from core.tool_models import chat_memory
-from ctc.data_models.categories import RevitCategories, RevitCategory
+from ctc.catalog import get_catalog
+from ctc.client import get_client
+from ctc.settings import CTCSettings, get_settings
+from ctc.data_models.categories import RevitCategories
 
 
 # Revit Tool Implementations
-async def get_categories() -> RevitCategories:
-    """Retrieves all Revit Categories from a constants list"""
-    import csv
-
-    file_path = "ctc/constants/Category_2025.csv"
-    with open(file_path, "r") as open_file:
-        open_file = csv.DictReader(open_file)
-        categories: RevitCategories = RevitCategories()
-        for row in open_file:
-            if row["IsObsolete"] == "FALSE" and row["ForLLM"] == "TRUE":
-                category = RevitCategory.model_validate(row)
-                categories.Categories.append(category)
-    return categories
-
-
-async def get_categories_depricated() -> Dict[str, Any]:
+async def get_categories(RevitVersion: str = "") -> RevitCategories:
+    """Retrieves the Revit Categories for the LLM from the compiled constants
+    catalog, new models on every call so callers may fill them in"""
+    return get_catalog(RevitVersion).categories()
+
+
+async def get_categories_depricated(
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
     """Retrieves all the floor plans and 3D views in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/revit-categories"
-        params = {"apiKey": api_key}
-
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    categories = await response.json()
-
-                    # Store raw data in memory
-                    chat_memory.store_categories(categories)
-
-                    return {"success": True, "result": categories}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to fetch categories. Status code: {response.status}",
-                    }
-        except Exception as e:
-            return {"success": False, "error": f"Error fetching categories: {str(e)}"}
+    client = get_client(revit_port)
+    path = "/api/v1/revit-categories"
+    params = {"apiKey": api_key}
+
+    try:
+        status, categories = await client.get_json(path, params=params)
+        if status == 200:
+            # Store raw data in memory
+            chat_memory.store_categories(categories)
+
+            return {"success": True, "result": categories}
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to fetch categories. Status code: {status}",
+            }
+    except Exception as e:
+        return {"success": False, "error": f"Error fetching categories: {str(e)}"}
 
 
 # Prevent running from this file
@@ -1,162 +1,718 @@
 """Core functions for CTC Chatbot to get Elements from the Revit API"""
 
-import os
-from typing import Dict, Any
-from dotenv import load_dotenv
-import aiohttp
+import asyncio
+import functools
+import time
+from typing import Dict, Any, Optional, AsyncIterator, Iterable, List, Set, Tuple
 
 from core.tool_models import chat_memory
+from ctc.api_categories import get_categories
+from ctc.client import get_client
+from ctc.response_cache import response_cache
+from ctc.settings import CTCSettings, get_settings
 from ctc.data_models.sessions import RevitSession
 from ctc.data_models.categories import RevitCategory
+from ctc.data_models.changes import (
+    ChangeKind,
+    ChangeSet,
+    ElementChange,
+    element_fingerprint,
+    parameter_changes,
+    raw_fingerprint,
+)
+from ctc.data_models.columnar import ElementColumns
+from ctc.data_models.common import item_key
 from ctc.data_models.elements import RevitElement
 from ctc.data_models.families import RevitFamily
 from ctc.data_models.family_types import RevitFamilyType
+from ctc.data_models.edits import ElementEdit, EditResult, EditReport, EditStatus
+from ctc.data_models.parameters import Parameter, definition_scope
+from ctc.data_models.projection import ElementProjection
+from ctc.summary import summarize
+from utils.json_stream import iter_json_array
 
+# Bytes read per chunk when streaming elements
+STREAM_CHUNK_SIZE = 64 * 1024
 
-# Load environment variables from .env file in this directory
+
+# Functions
+def project_definitions(function):
+    """Runs an element fetch with the parameter definitions of the project open
+    on the settings' port, so definitions are not shared across projects"""
+
+    @functools.wraps(function)
+    async def wrapper(*args, settings: Optional[CTCSettings] = None, **kwargs):
+        settings = settings or get_settings()
+        with definition_scope(response_cache.project(settings.RevitPort)):
+            return await function(*args, settings=settings, **kwargs)
+
+    return wrapper
 
 
 # Revit Tool Implementations
+@project_definitions
 async def get_elements(
     *,
     session: RevitSession,
     category: RevitCategory,
-    # IncludeParameters: str = "false",
+    settings: Optional[CTCSettings] = None,
+    stream: bool = False,
+    projection: Optional[ElementProjection] = None,
 ) -> RevitCategory:
-    """API call to get the elements in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    """API call to get the elements in the project.
+    With stream the response is parsed incrementally through iter_elements.
+    A projection limits the fields fetched, validated and kept in the tree"""
+    if stream:
+        try:
+            async for _ in iter_elements(
+                session=session,
+                category=category,
+                settings=settings,
+                projection=projection,
+            ):
+                pass
+            return {"success": True, "result": category}
+        except Exception as e:
+            return {
+                "success": False,
+                "result": category,
+                "error": f"Error fetching elements: {str(e)}",
+            }
+
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/elements"
-        params = {
-            "apiKey": api_key,
-            "categoryId": category.Id,
-            # "includeParameters": IncludeParameters,
-            # "includeFamily": "false",
-            # "includeType": "false",
-        }
-        print(f"Getting Elements for Category: {category.Name}")
+    client = get_client(revit_port)
+    path = "/api/v1/elements"
+    params = element_params(api_key, category, projection)
+    print(f"Getting Elements for Category: {category.Name}")
 
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    elements = await response.json()
-
-                    for element in elements:
-                        # Build the each element model part
-                        try:
-                            element_family_model = RevitFamily.model_validate(
-                                element["type"]["family"]
-                            )
-                        except Exception:
-                            default_family = {
-                                "id": -1,
-                                "name": category.Name,
-                            }
-                            element_family_model = RevitFamily.model_validate(
-                                default_family
-                            )
-                        element_type_model = RevitFamilyType.model_validate(
-                            element["type"]
-                        )
-                        element_model = RevitElement.model_validate(element)
-
-                        # Validate the existence of each part in the category
-                        # Add the family to the category
-                        if not category.has_family(element_family_model):
-                            category.Families.append(element_family_model)
-
-                        # Get the index of the family in the category
-                        fam_i = category.get_family_index(element_family_model)
-
-                        if not (category.has_type(element_type_model)):
-                            category.Families[fam_i].Types.append(element_type_model)
-
-                        fam_i, type_i = category.get_fam_type_index(element_type_model)
-                        if (
-                            not category.Families[fam_i]
-                            .Types[type_i]
-                            .has_instance(element_model)
-                        ):
-                            category.Families[fam_i].Types[type_i].Instances.append(
-                                element_model
-                            )
-                        elem_i = (
-                            category.Families[fam_i]
-                            .Types[type_i]
-                            .get_instance_index(element_model)
-                        )
-                        # Update instance to match the latest data
-                        category.Families[fam_i].Types[type_i].Instances[elem_i] = (
-                            element_model
-                        )
+    try:
+        status, elements = await client.get_json(path, params=params)
+        if status == 200:
+            for element in elements:
+                add_element(
+                    category, element, projection, trusted=settings.trust_element()
+                )
 
-                    # Store name to ID mappings
-                    # chat_memory.store_elements(elements)
+            # Store name to ID mappings
+            # chat_memory.store_elements(elements)
 
-                    return {"success": True, "result": category}
-                else:
-                    return {
-                        "success": False,
-                        "result": category,
-                        "error": f"Failed to fetch elements. Status code: {response.status}",
-                    }
-        except Exception as e:
+            return {"success": True, "result": category}
+        else:
             return {
                 "success": False,
                 "result": category,
-                "error": f"Error fetching elements: {str(e)}",
+                "error": f"Failed to fetch elements. Status code: {status}",
+            }
+    except Exception as e:
+        return {
+            "success": False,
+            "result": category,
+            "error": f"Error fetching elements: {str(e)}",
+        }
+
+
+async def get_category_elements(
+    CategoryId: int,
+    Projection: str = "types",
+    ParameterNames: str = "",
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Tool entry point, gets the elements of a category by id with a projection"""
+    settings = settings or get_settings()
+    categories = await get_categories()
+    category = categories.get_category_by_id(CategoryId)
+    if category is None:
+        return {"success": False, "error": f"Category {CategoryId} not found"}
+
+    session = RevitSession(RevitVersion="", Port=settings.RevitPort)
+    response = await get_elements(
+        session=session,
+        category=category,
+        settings=settings,
+        projection=ElementProjection.parse(Projection, ParameterNames),
+    )
+    # The base of later refresh_category_elements calls, a failed fetch would
+    # leave an empty or partial tree
+    if response["success"]:
+        store_category(tree_key(CategoryId, Projection, ParameterNames), category)
+    return response
+
+
+async def iter_elements(
+    *,
+    session: RevitSession,
+    category: RevitCategory,
+    settings: Optional[CTCSettings] = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    projection: Optional[ElementProjection] = None,
+) -> AsyncIterator[RevitElement]:
+    """Streams the elements of a category, yielding each validated RevitElement as
+    soon as it is parsed. Elements are merged into the category as they arrive,
+    so peak memory follows chunk_size instead of the size of the category"""
+    settings = settings or get_settings()
+    if not settings.ApiKey:
+        raise ValueError("CTC_API_KEY not found in environment variables")
+
+    async for element in iter_raw_elements(
+        category=category,
+        settings=settings,
+        chunk_size=chunk_size,
+        projection=projection,
+    ):
+        yield add_element(
+            category, element, projection, trusted=settings.trust_element()
+        )
+
+
+async def iter_raw_elements(
+    *,
+    category: RevitCategory,
+    settings: CTCSettings,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    projection: Optional[ElementProjection] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Streams the raw element dicts of a category as they are parsed"""
+    client = get_client(settings.RevitPort)
+    url = client.url("/api/v1/elements")
+    params = element_params(settings.ApiKey, category, projection)
+    print(f"Streaming Elements for Category: {category.Name}")
+
+    async with client.session.get(url, params=params) as response:
+        if response.status != 200:
+            raise ValueError(
+                f"Failed to fetch elements. Status code: {response.status}"
+            )
+        chunks = response.content.iter_chunked(chunk_size)
+        async for element in iter_json_array(chunks):
+            yield element
+
+
+@project_definitions
+async def refresh_elements(
+    *,
+    category: RevitCategory,
+    settings: Optional[CTCSettings] = None,
+    projection: Optional[ElementProjection] = None,
+) -> Dict[str, Any]:
+    """Re-fetches the elements of a category and merges only what changed.
+    Each element is fingerprinted from its name, type and parameter values;
+    elements matching their last fingerprint are skipped without validation.
+    Returns a ChangeSet of the added, removed and modified elements"""
+    settings = settings or get_settings()
+    if not settings.ApiKey:
+        raise ValueError("CTC_API_KEY not found in environment variables")
+
+    start = time.perf_counter()
+    previous = category.instance_map()
+    fingerprints = category.fingerprints()
+    change_set = ChangeSet(CategoryId=category.Id, CategoryName=category.Name)
+    stale: List[RevitElement] = []  # old instances replaced by a moved or renamed one
+    seen = set()
+    # Changed elements with their fingerprint and previous instance, merged
+    # only once the whole list arrived so a failed refresh leaves the tree as is
+    changed: List[Tuple[Dict[str, Any], int, Optional[RevitElement]]] = []
+
+    try:
+        async for element in iter_raw_elements(
+            category=category, settings=settings, projection=projection
+        ):
+            if projection:
+                element = projection.apply(element)
+            element_type = element.get("type") or default_element_type(category)
+            type_key = raw_key(element_type)
+            fingerprint = raw_fingerprint(element, type_key)
+            element_id = element.get("id")
+            seen.add(element_id)
+
+            old = None
+            if element_id in previous:
+                fam_i, type_i, old = previous[element_id]
+                old_type = category.Families[fam_i].Types[type_i]
+                old_fingerprint = fingerprints.get(element_id)
+                if old_fingerprint is None:
+                    old_fingerprint = element_fingerprint(old, item_key(old_type))
+                if old_fingerprint == fingerprint:
+                    fingerprints[element_id] = fingerprint
+                    change_set.Unchanged += 1
+                    continue
+                if item_key(old_type) != type_key or old.Name != element.get("name"):
+                    # Merged as a new instance, the old one goes
+                    stale.append(old)
+            changed.append((element, fingerprint, old))
+    except Exception as e:
+        # Without the full list nothing is merged or reported as removed
+        change_set.Unchanged = 0
+        change_set.Seconds = round(time.perf_counter() - start, 3)
+        return {
+            "success": False,
+            "result": change_set,
+            "error": f"Error refreshing elements: {str(e)}",
+        }
+
+    for element, fingerprint, old in changed:
+        element_type = element.get("type") or default_element_type(category)
+        new = add_element(category, element, trusted=settings.trust_element())
+        fingerprints[new.Id] = fingerprint
+        change_set.Changes.append(
+            ElementChange(
+                ElementId=new.Id,
+                Name=new.Name,
+                Change=ChangeKind.ADDED if old is None else ChangeKind.MODIFIED,
+                Type=element_type.get("name"),
+                Parameters=[] if old is None else parameter_changes(old, new),
+            )
+        )
+
+    for element_id, (fam_i, type_i, old) in previous.items():
+        if element_id not in seen:
+            stale.append(old)
+            fingerprints.pop(element_id, None)
+            change_set.Changes.append(
+                ElementChange(
+                    ElementId=old.Id,
+                    Name=old.Name,
+                    Change=ChangeKind.REMOVED,
+                    Type=category.Families[fam_i].Types[type_i].Name,
+                )
+            )
+    category.remove_instances(stale)
+    change_set.Seconds = round(time.perf_counter() - start, 3)
+    return {"success": True, "result": change_set}
+
+
+async def refresh_category_elements(
+    CategoryId: int,
+    Projection: str = "types",
+    ParameterNames: str = "",
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Tool entry point, re-fetches a category and reports what changed since the
+    last get_elements or refresh with the same projection"""
+    key = tree_key(CategoryId, Projection, ParameterNames)
+    category = chat_memory.get_category_tree(key)
+    if category is None:
+        categories = await get_categories()
+        category = categories.get_category_by_id(CategoryId)
+        if category is None:
+            return {"success": False, "error": f"Category {CategoryId} not found"}
+
+    response = await refresh_elements(
+        category=category,
+        settings=settings,
+        projection=ElementProjection.parse(Projection, ParameterNames),
+    )
+    # A failed refresh leaves the tree untouched, the stored one stays
+    if response["success"]:
+        store_category(key, category)
+    return response
+
+
+def tree_key(CategoryId: int, Projection: str, ParameterNames: str) -> str:
+    """Chat memory key of a category tree fetched with a projection"""
+    return f"{CategoryId}:{Projection}:{ParameterNames}"
+
+
+def store_category(key: str, category: RevitCategory) -> None:
+    """Stores a fetched category tree with its columns and summary, computed
+    once here for query_elements and get_category_summary"""
+    chat_memory.store_category_tree(key, category)
+    columns = ElementColumns.from_category(category)
+    chat_memory.store_category_columns(key, columns)
+    chat_memory.store_category_summary(key, summarize(columns))
+
+
+def element_params(
+    api_key: str,
+    category: RevitCategory,
+    projection: Optional[ElementProjection] = None,
+) -> Dict[str, Any]:
+    """Query parameters of the /api/v1/elements endpoint"""
+    params = {
+        "apiKey": api_key,
+        "categoryId": category.Id,
+    }
+    if projection:
+        params.update(projection.query_params())
+    return params
+
+
+def add_element(
+    category: RevitCategory,
+    element: Dict[str, Any],
+    projection: Optional[ElementProjection] = None,
+    trusted: bool = False,
+) -> RevitElement:
+    """Merges one element of the api response, with its family and type, into
+    the category. Returns the element model. Trusted elements are constructed
+    without validation and reuse the family and type models already in the
+    category. Validated elements also validate their family and type, and
+    update the parameters of a known type that changed"""
+    if projection:
+        element = projection.apply(element)
+    element_type = element.get("type") or default_element_type(category)
+    element_model = None
+    if trusted:
+        try:
+            element_model = RevitElement.from_api(element)
+        except (KeyError, TypeError, AttributeError):
+            # Not shaped like the add-in's response, validation reports why
+            trusted = False
+    if element_model is None:
+        element_model = RevitElement.model_validate(element)
+
+    # Validate the existence of each part in the category, each lookup is a
+    # dict hit on the (Id, Name) indexes so merging a category stays linear
+    fam_i, type_i = -1, -1
+    if trusted:
+        fam_i, type_i = category.find_type(raw_key(element_type))
+    if fam_i == -1:
+        # Build the family and type models
+        try:
+            element_family_model = RevitFamily.model_validate(element_type["family"])
+        except Exception:
+            default_family = {
+                "id": -1,
+                "name": category.Name,
             }
+            element_family_model = RevitFamily.model_validate(default_family)
+        element_type_model = RevitFamilyType.model_validate(element_type)
+
+        fam_i = category.get_family_index(element_family_model)
+        if fam_i == -1:
+            fam_i = category.add_family(element_family_model)
+
+        fam_i, type_i = category.get_fam_type_index(element_type_model)
+        if fam_i == -1:
+            fam_i = category.get_family_index(element_family_model)
+            type_i = category.add_type(fam_i, element_type_model)
+        else:
+            # Trusted elements reuse this type, keep it current
+            category.update_type_parameters(
+                fam_i, type_i, element_type_model.Parameters
+            )
+
+    # Add the instance, or update it to match the latest data
+    category.merge_instance(fam_i, type_i, element_model)
+    return element_model
+
+
+def default_element_type(category: RevitCategory) -> Dict[str, Any]:
+    """Elements fetched without type info are grouped under the category name"""
+    return {"id": -1, "name": category.Name}
 
 
-async def get_element_details(ElementId: int) -> Dict[str, Any]:
+def raw_key(data: Dict[str, Any]) -> Tuple[int, str]:
+    """(Id, Name) key of an api dict, with the model defaults"""
+    return data.get("id", -1), data.get("name")
+
+
+async def get_element_details(
+    ElementId: int, settings: Optional[CTCSettings] = None
+) -> Dict[str, Any]:
     """API call to get the elements in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/elements/{ElementId}"
-        params = {"apiKey": api_key}
-        print(f"Parameters: {params}")
+    client = get_client(revit_port)
+    path = f"/api/v1/elements/{ElementId}"
+    params = {"apiKey": api_key}
+    print(f"Parameters: {params}")
 
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    elements = await response.json()
-
-                    # Store name to ID mappings
-                    chat_memory.store_elements(elements)
-
-                    return {"success": True, "result": elements}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to fetch elements. Status code: {response.status}",
-                    }
-        except Exception as e:
-            return {"success": False, "error": f"Error fetching elements: {str(e)}"}
+    try:
+        status, elements = await client.get_json(path, params=params)
+        if status == 200:
+            # Store name to ID mappings
+            chat_memory.store_elements(elements)
+
+            response = {"success": True, "result": elements}
+        else:
+            response = {
+                "success": False,
+                "error": f"Failed to fetch elements. Status code: {status}",
+            }
+    except Exception as e:
+        response = {"success": False, "error": f"Error fetching elements: {str(e)}"}
+
+    # Where the element sits in the category trees already fetched
+    location = element_location(ElementId)
+    if location is not None:
+        response["location"] = location
+    return response
+
+
+def element_location(ElementId: int) -> Optional[Dict[str, Any]]:
+    """Category, family and type of an element in the stored category trees,
+    None when no fetched category holds it"""
+    location = chat_memory.elements.locate(ElementId)
+    if location is None:
+        return None
+    category = chat_memory.get_category_tree(location.Key)
+    family = category.Families[location.Family]
+    return {
+        "CategoryId": category.Id,
+        "CategoryName": category.Name,
+        "Family": family.Name,
+        "Type": family.Types[location.Type].Name,
+    }
+
+
+async def get_elements_details(
+    ElementIds: List[int],
+    MaxConcurrency: int = 8,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """API calls to get the details of many elements, at most MaxConcurrency
+    requests at a time. Returns the details by id and the errors by id"""
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
+    if not api_key:
+        raise ValueError("CTC_API_KEY not found in environment variables")
+
+    client = get_client(revit_port)
+    params = {"apiKey": api_key}
+    semaphore = asyncio.Semaphore(max(1, MaxConcurrency))
+
+    async def fetch(element_id: int) -> Tuple[int, Any, Optional[str]]:
+        async with semaphore:
+            try:
+                path = f"/api/v1/elements/{element_id}"
+                status, element = await client.get_json(path, params=params)
+                if status == 200:
+                    return element_id, element, None
+                return (
+                    element_id,
+                    None,
+                    f"Failed to fetch element. Status code: {status}",
+                )
+            except Exception as e:
+                return element_id, None, f"Error fetching element: {str(e)}"
+
+    # Duplicate ids are fetched once, order is kept
+    results = await asyncio.gather(*(fetch(i) for i in dict.fromkeys(ElementIds)))
+    details = {i: element for i, element, error in results if error is None}
+    errors = {i: error for i, _, error in results if error is not None}
+
+    # Store all details in memory in one update
+    chat_memory.store_elements_details(list(details.values()))
+
+    response = {"success": bool(details) or not errors, "result": details}
+    if errors:
+        response["errors"] = errors
+        response["error"] = f"{len(errors)} of {len(results)} elements failed"
+    return response
 
 
 async def update_element(
-    element_id: int, parameter_id: int, value: Any
+    element_id: int,
+    parameter_id: int,
+    value: Any,
+    settings: Optional[CTCSettings] = None,
 ) -> Dict[str, Any]:
-    """API call to update a new element in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    """API call to update a parameter of an element in the project"""
+    edit = {"ElementId": element_id, "ParameterId": parameter_id, "Value": value}
+    return await update_elements([edit], settings=settings)
+
+
+async def update_elements(
+    Edits: List[Dict[str, Any]],
+    MaxConcurrency: int = 4,
+    category: Optional[RevitCategory] = None,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """API calls to write many parameter values. Edits of the same element are
+    sent in one request, a later edit of the same parameter wins, and values
+    matching the cached state (the category if given, else the element details
+    in memory) are skipped. Values of cached parameters are converted to their
+    storage type first, an edit that does not convert fails without a request.
+    At most MaxConcurrency requests run at a time"""
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/elements/{element_id}"
-        params = {"apiKey": api_key}
+    start = time.perf_counter()
+    edits = [ElementEdit.model_validate(edit) for edit in Edits]
+    results = [
+        EditResult(
+            ElementId=e.ElementId, ParameterId=e.ParameterId, Status=EditStatus.UPDATED
+        )
+        for e in edits
+    ]
+
+    # Coalesce per element, remembering which result each kept edit reports to
+    pending: Dict[int, Dict[int, int]] = {}  # element -> parameter -> edit index
+    for i, edit in enumerate(edits):
+        parameters = pending.setdefault(edit.ElementId, {})
+        if edit.ParameterId in parameters:
+            results[parameters[edit.ParameterId]].update(Status=EditStatus.SUPERSEDED)
+        parameters[edit.ParameterId] = i
+
+    # Skip values that already match the cached state, and convert the others
+    # to the storage type of the cached parameter before anything is sent
+    cached = cached_parameters(pending.keys(), category)
+    values: Dict[int, Any] = {}  # edit index -> value sent
+    for element_id, parameters in pending.items():
+        for parameter_id, i in list(parameters.items()):
+            parameter = cached.get(element_id, {}).get(parameter_id)
+            if parameter is None:
+                values[i] = edits[i].Value
+                continue
+            if parameter.matches_value(edits[i].Value):
+                results[i].update(Status=EditStatus.UNCHANGED)
+                del parameters[parameter_id]
+                continue
+            try:
+                values[i] = parameter_value(parameter.StorageType, edits[i].Value)
+            except (TypeError, ValueError):
+                results[i].update(
+                    Status=EditStatus.FAILED,
+                    Error=f"Invalid value for a {parameter.StorageType} parameter: "
+                    f"{edits[i].Value!r}",
+                )
+                del parameters[parameter_id]
+    pending = {e: parameters for e, parameters in pending.items() if parameters}
+
+    client = get_client(revit_port)
+    params = {"apiKey": api_key}
+    semaphore = asyncio.Semaphore(max(1, MaxConcurrency))
+    written: Set[str] = set()  # keys of the stored trees written to
+    stale: Set[str] = set()  # keys of the stored trees a value did not fit
+
+    async def submit(element_id: int, parameters: Dict[int, int]) -> None:
+        data = {
+            "parameters": [
+                {"id": parameter_id, "value": values[i]}
+                for parameter_id, i in parameters.items()
+            ]
+        }
+        error = None
+        async with semaphore:
+            try:
+                url = client.url(f"/api/v1/elements/{element_id}")
+                async with client.session.put(
+                    url, params=params, json=data
+                ) as response:
+                    if response.status != 200:
+                        error = (
+                            f"Failed to update element. Status code: {response.status}"
+                        )
+            except Exception as e:
+                error = f"Error updating element: {str(e)}"
+        if error:
+            for i in parameters.values():
+                results[i].update(Status=EditStatus.FAILED, Error=error)
+            return
+        cached_element = cached.get(element_id, {})
+        for parameter_id, i in parameters.items():
+            cached_parameter = cached_element.get(parameter_id)
+            if cached_parameter is not None:
+                set_parameter_value(cached_parameter, values[i])
+        # Every stored tree holding the element, e.g. fetched with another
+        # projection, gets the written values too
+        for key, element in chat_memory.elements.copies(element_id):
+            for parameter in element.Parameters:
+                if parameter.Id not in parameters:
+                    continue
+                try:
+                    set_parameter_value(parameter, values[parameters[parameter.Id]])
+                except (TypeError, ValueError):
+                    # Revit took a value the cached parameter cannot hold
+                    stale.add(key)
+                written.add(key)
+
+    await asyncio.gather(*(submit(e, parameters) for e, parameters in pending.items()))
+
+    # Stored element details hold the values before the write
+    chat_memory.drop_element_details(pending.keys())
+
+    # Stored trees written to get their columns and summary again, those that
+    # could not take a value are dropped
+    for key in written:
+        if key in stale:
+            chat_memory.drop_category_tree(key)
+        else:
+            store_category(key, chat_memory.get_category_tree(key))
+
+    # Cached element responses no longer match the project
+    response_cache.invalidate(revit_port, "/api/v1/elements", prefix=True)
+
+    report = EditReport(
+        Results=results, Requests=len(pending), Seconds=time.perf_counter() - start
+    )
+    response = {"success": report.Failed == 0, "result": report}
+    if report.Failed:
+        response["error"] = f"{report.Failed} of {report.Count} edits failed"
+    return response
+
+
+def cached_parameters(
+    element_ids: Iterable[int], category: Optional[RevitCategory] = None
+) -> Dict[int, Dict[int, Parameter]]:
+    """Known parameter values by element and parameter id, from the category
+    instances when given, otherwise merged from every stored category tree
+    holding the element and the element details in memory"""
+    wanted = set(element_ids)
+    cached: Dict[int, Dict[int, Parameter]] = {}
+    if category is not None:
+        for family in category.Families:
+            for type in family.Types:
+                for element in type.Instances:
+                    if element.Id in wanted:
+                        cached[element.Id] = {p.Id: p for p in element.Parameters}
+        return cached
+
+    # A tree may hold some or none of the parameters (e.g. the types
+    # projection), so every copy and the details add the ones still missing
+    details = chat_memory.context_data["name_to_id_mappings"].get("element", {})
+    for element_id in wanted:
+        parameters: Dict[int, Parameter] = {}
+        for _, element in chat_memory.elements.copies(element_id):
+            for parameter in element.Parameters:
+                parameters.setdefault(parameter.Id, parameter)
+        element = details.get(element_id)
+        if isinstance(element, dict) and element.get("parameters"):
+            for data in element["parameters"]:
+                parameter = Parameter.model_validate(data)
+                parameters.setdefault(parameter.Id, parameter)
+        if parameters:
+            cached[element_id] = parameters
+    return cached
+
+
+def parameter_value(storage_type: str, value: Any) -> Any:
+    """The value converted to a parameter storage type, raises ValueError or
+    TypeError when it does not convert"""
+    match storage_type:
+        case "Integer" | "ElementId":
+            return int(value)
+        case "Double":
+            return float(value)
+        case _:
+            return str(value)
+
+
+def set_parameter_value(parameter: Parameter, value: Any) -> None:
+    """Writes a value into the field matching the parameter storage type"""
+    value = parameter_value(parameter.StorageType, value)
+    match parameter.StorageType:
+        case "Integer":
+            parameter.update(ValueAsInteger=value, HasValue=True)
+        case "Double":
+            parameter.update(ValueAsDouble=value, HasValue=True)
+        case "ElementId":
+            parameter.update(ValueAsElementId=value, HasValue=True)
+        case _:
+            parameter.update(ValueAsString=value, HasValue=True)
 
 
 # Prevent running from this file
@@ -1,13 +1,12 @@
 """Core functions for CTC Chatbot to get Families from the Revit API"""
 
 # Imports
-import os
-from typing import Dict, Any
-from dotenv import load_dotenv
-import aiohttp
+from typing import Dict, Any, Optional
 import asyncio
 
 from core.tool_models import chat_memory
+from ctc.client import get_client
+from ctc.settings import CTCSettings, get_settings
 from ctc.data_models.families import RevitFamily, RevitFamilyType
 from ctc.data_models.categories import RevitCategory
 from ctc.data_models.sessions import RevitSession
@@ -22,10 +21,11 @@ async def get_families(
     *,
     session: RevitSession,
     category: RevitCategory,
+    settings: Optional[CTCSettings] = None,
 ) -> RevitCategory:
     """API call to get the families in the project"""
-    load_dotenv()
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    api_key = settings.ApiKey
     revit_port = session.Port
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
@@ -39,7 +39,7 @@ async def get_families(
                 scope_box_family.Types.append(
                     RevitFamilyType.model_validate(scope_box_model)
                 )
-                category.Families.append(scope_box_family)
+                category.add_family(scope_box_family)
                 return {
                     "success": False,
                     "result": category,
@@ -56,6 +56,7 @@ async def get_families(
                 view_template = await get_view_templates(
                     session=session,
                     category=category,
+                    settings=settings,
                 )
                 category = view_template["result"]
                 return {
@@ -73,6 +74,7 @@ async def get_families(
                 worksets = await get_worksets(
                     session=session,
                     category=category,
+                    settings=settings,
                 )
                 category = worksets["result"]
                 return {
@@ -92,36 +94,34 @@ async def get_families(
                 "error": "Category not Implemented",
             }
         case _:
-            async with aiohttp.ClientSession() as session:
-                url = f"http://localhost:{revit_port}/api/v1/families"
-                params = {
-                    "apiKey": api_key,
-                    "categoryId": category.Id,
-                }
-
-                try:
-                    async with session.get(url, params=params) as response:
-                        if response.status == 200:
-                            families = await response.json()
+            client = get_client(revit_port)
+            path = "/api/v1/families"
+            params = {
+                "apiKey": api_key,
+                "categoryId": category.Id,
+            }
 
-                            # Enter families into RevitCategory
-                            for family in families:
-                                family = RevitFamily.model_validate(family)
-                                category.Families.append(family)
+            try:
+                status, families = await client.get_json(path, params=params)
+                if status == 200:
+                    # Enter families into RevitCategory
+                    for family in families:
+                        family = RevitFamily.model_validate(family)
+                        category.add_family(family)
 
-                            return {"success": True, "result": category}
-                        else:
-                            return {
-                                "success": False,
-                                "result": category,
-                                "error": f"Failed to fetch families. Status code: {response.status}",
-                            }
-                except Exception as e:
+                    return {"success": True, "result": category}
+                else:
                     return {
                         "success": False,
                         "result": category,
-                        "error": f"Error fetching families: {str(e)}",
+                        "error": f"Failed to fetch families. Status code: {status}",
                     }
+            except Exception as e:
+                return {
+                    "success": False,
+                    "result": category,
+                    "error": f"Error fetching families: {str(e)}",
+                }
 
 
 # Prevent running from this file
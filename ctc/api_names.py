@@ -0,0 +1,58 @@
+"""Core functions for CTC Chatbot to resolve typed names to Revit IDs"""
+
+from typing import Any, Dict, List, Optional
+
+from core.tool_models import chat_memory
+from ctc.api_views import cached_view_ids, get_views
+from ctc.catalog import get_catalog
+from ctc.data_models.names import NameMatch
+from ctc.settings import CTCSettings, get_settings
+
+# Kinds of names in chat memory, in the order they are searched
+NAME_KINDS = ("levels", "templates", "views", "categories", "sessions", "elements")
+
+
+# Revit Tool Implementations
+async def resolve_name(
+    Name: str,
+    Kind: str = "",
+    Limit: int = 5,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Tool entry point, ranked ID candidates for a name as the user typed it"""
+    kinds = [k.strip().lower() for k in Kind.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in NAME_KINDS]
+    if unknown:
+        return {
+            "success": False,
+            "error": f"Unknown kind {', '.join(unknown)}, use {', '.join(NAME_KINDS)}",
+        }
+    kinds = kinds or list(NAME_KINDS)
+    await load_names(kinds, settings or get_settings())
+    matches = chat_memory.names.search(Name, kinds, limit=min(max(int(Limit), 1), 20))
+    return {"success": True, "result": [NameMatch(**m) for m in matches]}
+
+
+async def load_names(kinds: List[str], settings: CTCSettings) -> None:
+    """Fills chat memory with the names of the kinds it does not hold yet.
+    Categories come from the catalog, levels, templates and views from Revit;
+    a kind that cannot be fetched is left out of the search"""
+    names = chat_memory.names
+    if "categories" in kinds and not names.has_kind("categories"):
+        chat_memory.store_categories(
+            [{"name": r.Name, "id": int(r.Id)} for r in get_catalog().for_llm]
+        )
+    try:
+        if ("levels" in kinds and not names.has_kind("levels")) or (
+            "templates" in kinds and not names.has_kind("templates")
+        ):
+            await cached_view_ids(settings)
+        if "views" in kinds and not names.has_kind("views"):
+            await get_views(settings=settings)
+    except Exception:
+        pass
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
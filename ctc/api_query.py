@@ -0,0 +1,147 @@
+"""Core functions for CTC Chatbot to query and summarize Elements by their
+parameter values"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from core.tool_models import chat_memory
+from ctc.api_elements import get_category_elements, tree_key
+from ctc.data_models.summary import CategorySummary
+from ctc.data_models.columnar import ElementColumns
+from ctc.data_models.query import ElementQuery
+from ctc.query import run_query
+from ctc.settings import CTCSettings, get_settings
+from ctc.snapshot import open_snapshot
+
+# Most rows or groups a query returns to the model
+MAX_QUERY_ROWS = 500
+
+
+# Revit Tool Implementations
+async def query_elements(
+    CategoryId: int,
+    Filters: Optional[List[Dict[str, Any]]] = None,
+    GroupBy: str = "",
+    Aggregate: str = "count",
+    AggregateParameter: str = "",
+    SortBy: str = "",
+    Descending: bool = False,
+    Columns: str = "",
+    Limit: int = 50,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Tool entry point, filters, groups and sorts the elements of a category
+    on their parameter values and returns only the matching rows or groups"""
+    try:
+        query = ElementQuery(
+            Filters=Filters or [],
+            GroupBy=GroupBy or None,
+            Aggregate=Aggregate or "count",
+            AggregateParameter=AggregateParameter or None,
+            SortBy=SortBy or None,
+            Descending=Descending,
+            Columns=[n.strip() for n in Columns.split(",") if n.strip()],
+            Limit=min(max(int(Limit), 1), MAX_QUERY_ROWS),
+        )
+    except ValidationError as e:
+        return {"success": False, "error": f"Invalid query: {str(e)}"}
+
+    response = await category_columns(CategoryId, query.parameter_names(), settings)
+    if not response["success"]:
+        return response
+    try:
+        return {"success": True, "result": run_query(response["result"], query)}
+    except ValueError as e:
+        return {"success": False, "error": f"Invalid query: {str(e)}"}
+
+
+async def get_category_summary(
+    CategoryId: int,
+    ParameterNames: str = "",
+    TopValues: int = 5,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Tool entry point, instance counts per family and type and the value
+    histograms of the named parameters (all fetched ones when empty)"""
+    settings = settings or get_settings()
+    names = [n.strip() for n in ParameterNames.split(",") if n.strip()]
+    summary = stored_summary(CategoryId, names, settings)
+    if summary is None:
+        response = await get_category_elements(
+            CategoryId,
+            Projection="parameters" if names else "types",
+            ParameterNames=",".join(names),
+            settings=settings,
+        )
+        if not response["success"]:
+            return response
+        # Computed by get_category_elements when it stored the tree
+        summary = stored_summary(CategoryId, names, settings)
+    return {
+        "success": True,
+        "result": summary.select(names, min(max(int(TopValues), 0), 20)),
+    }
+
+
+def stored_summary(
+    CategoryId: int, names: List[str], settings: CTCSettings
+) -> Optional[CategorySummary]:
+    """Summary of the category from the snapshot or chat memory, computed when
+    the category was written or fetched"""
+    if settings.SnapshotPath:
+        snapshot = open_snapshot(settings.SnapshotPath)
+        if snapshot.entry(CategoryId) is not None:
+            return snapshot.summary(CategoryId)
+    keys = [tree_key(CategoryId, "full", "")]
+    if names:
+        keys.append(tree_key(CategoryId, "parameters", ",".join(names)))
+    else:
+        keys.append(tree_key(CategoryId, "types", ""))
+    for key in keys:
+        summary = chat_memory.get_category_summary(key)
+        if summary is not None:
+            return summary
+    return None
+
+
+async def category_columns(
+    CategoryId: int,
+    parameter_names: List[str],
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Columns of a category, from the configured snapshot, from a category
+    tree in chat memory or else fetched with only the named parameters"""
+    settings = settings or get_settings()
+    if settings.SnapshotPath:
+        snapshot = open_snapshot(settings.SnapshotPath)
+        if snapshot.entry(CategoryId) is not None:
+            return {"success": True, "result": snapshot.columns(CategoryId)}
+
+    # A full tree answers any query
+    key = tree_key(CategoryId, "full", "")
+    if chat_memory.get_category_tree(key) is None:
+        names = ",".join(parameter_names)
+        key = tree_key(CategoryId, "parameters" if names else "types", names)
+
+    columns = chat_memory.get_category_columns(key)
+    if columns is None:
+        category = chat_memory.get_category_tree(key)
+        if category is None:
+            response = await get_category_elements(
+                CategoryId,
+                Projection="parameters" if parameter_names else "types",
+                ParameterNames=",".join(parameter_names),
+                settings=settings,
+            )
+            if not response["success"]:
+                return response
+            category = response["result"]
+        columns = ElementColumns.from_category(category)
+        chat_memory.store_category_columns(key, columns)
+    return {"success": True, "result": columns}
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
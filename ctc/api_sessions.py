@@ -1,28 +1,34 @@
 """Core functions for CTC Chatbot to get avialable sessions from the BIM Automation Instances API Json file"""
 
+import asyncio
 from os import environ
 from typing import List, Optional, Dict
 
-from dotenv import load_dotenv, find_dotenv, set_key
 from pydantic import ValidationError
 from utils.file_utils import read_file_json
 from ctc.data_models.sessions import RevitSession, RevitSessions
 from ctc.api_projects import get_active_project
+from ctc.settings import get_settings, set_revit_port
+
+# Seconds a single session probe may take before the port is marked unreachable
+PROBE_TIMEOUT: float = 2.0
 
 
 # Functions
 ## get active sessions
-async def get_sessions() -> RevitSessions:
+async def get_sessions(probe_timeout: float = PROBE_TIMEOUT) -> RevitSessions:
     """Reads the active sessions from the CTC sessions folder"""
     try:
-        file_path: str = f"{environ['LOCALAPPDATA']}\\CTC Software\\BIM Automation\\BIM Automation API Instances.json"
+        file_path: str = (
+            f"{environ['LOCALAPPDATA']}\\CTC Software\\BIM Automation\\BIM Automation API Instances.json"
+        )
         file_json = read_file_json(file_path)
         rvt_sessions = RevitSessions()
         # RevitSessions.model_validate(file_json)
         for session in file_json:
             rvt_session: RevitSession = RevitSession.model_validate(session)
-            rvt_session = await get_active_model(rvt_session)
             rvt_sessions.Sessions.append(rvt_session)
+        await probe_sessions(rvt_sessions, probe_timeout)
 
         # sessions: RevitSessions = RevitSessions.model_validate(file_json)
     except ValidationError:
@@ -32,38 +38,54 @@ async def get_sessions() -> RevitSessions:
     return rvt_sessions
 
 
+## probe every session concurrently so a stale port cannot hold up the others
+async def probe_sessions(
+    rvt_sessions: RevitSessions, probe_timeout: float = PROBE_TIMEOUT
+) -> RevitSessions:
+    """Fetches the active model of all sessions at once, each within probe_timeout"""
+
+    async def probe(revit_session: RevitSession) -> None:
+        try:
+            await asyncio.wait_for(get_active_model(revit_session), probe_timeout)
+        except asyncio.TimeoutError:
+            revit_session.update(ActiveProject="", Reachable=False)
+
+    await asyncio.gather(*(probe(session) for session in rvt_sessions.Sessions))
+    return rvt_sessions
+
+
 ## fetch and record the active model for each session in revitsessions
 async def get_active_model(revit_session: RevitSession) -> RevitSession:
     """Fetches and records the active model for each session in RevitSessions"""
     try:
         port: int = revit_session.Port
-        response = await get_active_project(port)
+        # A liveness check, a cached project would report a dead port as reachable
+        response = await get_active_project(port, use_cache=False)
         if "title" in response["result"].keys():
             # temporary handling response in 2025
             active = response["result"]["title"]
         else:
             # temporary handling response in 2021
             active = response["result"]["Title"]
-        revit_session.update(ActiveProject=active)
+        revit_session.update(ActiveProject=active, Reachable=True)
     except Exception as e:
-        revit_session.update(ActiveProject="")
+        revit_session.update(ActiveProject="", Reachable=False)
     return revit_session
 
 
 ## return the active session
-async def get_active_session() -> RevitSession:
-    """Returns the active session from the settings in the dotenv file"""
+async def get_active_session() -> Optional[RevitSession]:
+    """Returns the active session from the cached settings, None when no
+    session runs on the cached port or the sessions cannot be read"""
     try:
-        load_dotenv()
-        port = int(environ["REVIT_PORT"])
+        port = get_settings().RevitPort
         rvt_sessions = await get_sessions()
         for session in rvt_sessions.Sessions:
             if session.Port == port:
                 return session
     except Exception as e:
         print(e)
-        session = RevitSession()
-        return session
+    return None
 
 
 ## set the active session/port in the .env file by direct input or by active model
@@ -75,7 +97,7 @@ async def set_active_session(Port: int = 0, ActiveProject: str = "") -> Dict[str
     )
     rvt_session = rvt_session.model_dump()
     try:
-        rvt_sessions = await get_sessions()
+        rvt_sessions = (await get_sessions()).model_dump()
         if Port == 0:
             for session in rvt_sessions["Sessions"]:
                 if session["ActiveProject"] == ActiveProject:
@@ -85,11 +107,9 @@ async def set_active_session(Port: int = 0, ActiveProject: str = "") -> Dict[str
             for session in rvt_sessions["Sessions"]:
                 if session["Port"] == Port:
                     rvt_session = session
-        dotenv_file = find_dotenv()
-        load_dotenv(dotenv_file, override=True)
 
-        environ["REVIT_PORT"] = str(Port)
-        set_key(dotenv_file, "REVIT_PORT", environ["REVIT_PORT"])
+        # Update the cached settings and persist the port in the .env file
+        set_revit_port(Port)
     except Exception as e:
         print(e)
 
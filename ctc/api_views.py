@@ -1,90 +1,91 @@
 """Core functions for CTC Chatbot to get Views from the Revit API"""
+
 # Depricated
 
-import os
 from datetime import datetime
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-import aiohttp
+import asyncio
+from typing import List, Dict, Any, Optional, Set, Tuple
 
 from core.tool_models import chat_memory
+from ctc.client import get_client
+from ctc.response_cache import response_cache
+from ctc.settings import CTCSettings, get_settings
 from ctc.data_models.families import RevitFamily, RevitFamilyType
 from ctc.data_models.categories import RevitCategory
 from ctc.data_models.sessions import RevitSession
+from ctc.data_models.views import FloorPlanSpec, FloorPlanResult, FloorPlanReport
+from ctc.api_levels import get_levels
 
 # Load environment variables from .env file in this directory
 
 
 # Revit Tool Implementations
-async def get_views() -> Dict[str, Any]:
+async def get_views(settings: Optional[CTCSettings] = None) -> Dict[str, Any]:
     """Retrieves all the floor plans and 3D views in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/views"
-        params = {"apiKey": api_key}
+    client = get_client(revit_port)
+    path = "/api/v1/views"
+    params = {"apiKey": api_key}
 
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    views = await response.json()
-
-                    # Store raw data in memory
-                    chat_memory.store_views(views)
-
-                    return {"success": True, "result": views}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to fetch views. Status code: {response.status}",
-                    }
-        except Exception as e:
-            return {"success": False, "error": f"Error fetching views: {str(e)}"}
+    try:
+        status, views = await client.get_json(path, params=params)
+        if status == 200:
+            # Store raw data in memory
+            chat_memory.store_views(views)
+
+            return {"success": True, "result": views}
+        else:
+            return {
+                "success": False,
+                "error": f"Failed to fetch views. Status code: {status}",
+            }
+    except Exception as e:
+        return {"success": False, "error": f"Error fetching views: {str(e)}"}
 
 
 async def get_view_templates(
     *,
     session: RevitSession,
     category: RevitCategory,
+    settings: Optional[CTCSettings] = None,
 ) -> RevitCategory:
     """Get the view templates in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/views/templates"
-        params = {"apiKey": api_key}
+    client = get_client(revit_port)
+    path = "/api/v1/views/templates"
+    params = {"apiKey": api_key}
 
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    templates = await response.json()
-
-                    # Enter View Templates into Category
-                    for template in templates:
-                        template = RevitFamily.model_validate(template)
-                        category.Families.append(template)
-
-                    return {"success": True, "result": category}
-                else:
-                    return {
-                        "success": False,
-                        "result": category,
-                        "error": f"Failed to fetch view templates. Status code: {response.status}",
-                    }
-        except Exception as e:
+    try:
+        status, templates = await client.get_json(path, params=params)
+        if status == 200:
+            # Enter View Templates into Category
+            for template in templates:
+                template = RevitFamily.model_validate(template)
+                category.add_family(template)
+
+            return {"success": True, "result": category}
+        else:
             return {
                 "success": False,
                 "result": category,
-                "error": f"Error fetching view templates: {str(e)}",
+                "error": f"Failed to fetch view templates. Status code: {status}",
             }
+    except Exception as e:
+        return {
+            "success": False,
+            "result": category,
+            "error": f"Error fetching view templates: {str(e)}",
+        }
 
 
 async def create_floor_plan(
@@ -92,45 +93,178 @@ async def create_floor_plan(
     LevelId: int,
     ViewTemplateId: int,
     ScopeBoxId: int = 0,
+    settings: Optional[CTCSettings] = None,
 ) -> Dict[str, Any]:
     """Create new floor plan in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/views/floor-plan"
-        params = {"apiKey": api_key}
+    client = get_client(revit_port)
+    url = client.url("/api/v1/views/floor-plan")
+    params = {"apiKey": api_key}
+
+    # Prepare request body
+    data = {
+        "Name": Name,
+        "LevelId": LevelId,
+        "ViewTemplateId": ViewTemplateId,
+        "ScopeBoxId": ScopeBoxId,
+    }
+
+    try:
+        async with client.session.post(url, params=params, json=data) as response:
+            if response.status == 200:
+                new_view = await response.json()
+
+                # The cached view list no longer matches the project
+                response_cache.invalidate(revit_port, "/api/v1/views")
+
+                # Store in memory with existing views
+                existing_views = chat_memory.get_views()
+                if existing_views:
+                    existing_views.append(new_view)
+                    chat_memory.store_views(existing_views)
+
+                return {"success": True, "result": new_view}
+            else:
+                return {
+                    "success": False,
+                    "error": f"Failed to create floor plan. Status code: {response.status}",
+                }
+    except Exception as e:
+        return {"success": False, "error": f"Error creating floor plan: {str(e)}"}
+
+
+async def create_floor_plans(
+    Specs: List[Dict[str, Any]],
+    MaxConcurrency: int = 2,
+    DryRun: bool = False,
+    settings: Optional[CTCSettings] = None,
+) -> Dict[str, Any]:
+    """Create many floor plans. Every spec is first checked against the cached
+    level and view template IDs and the existing view names; with DryRun only
+    that check runs. Valid specs are created with at most MaxConcurrency
+    requests at a time and the views in memory are updated once at the end"""
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
+    if not api_key:
+        raise ValueError("CTC_API_KEY not found in environment variables")
+
+    specs = []
+    results = []
+    for spec in Specs:
+        try:
+            specs.append(FloorPlanSpec.model_validate(spec))
+            results.append(FloorPlanResult(Name=specs[-1].Name))
+        except Exception as e:
+            # A spec that is not an object is rejected on its own
+            name = spec.get("Name", "") if isinstance(spec, dict) else ""
+            specs.append(None)
+            results.append(FloorPlanResult(Name=str(name), Error=str(e)))
+
+    # Dry-run validation pass against the cached IDs and names
+    level_ids, template_ids, error = await cached_view_ids(settings)
+    if error:
+        return {"success": False, "error": error}
+    # Names are checked against every view in the project
+    if not chat_memory.get_views():
+        response = await get_views(settings=settings)
+        if not response["success"]:
+            return response
+    taken = {view.get("name") for view in chat_memory.get_views()}
+    for spec, result in zip(specs, results):
+        if spec is None:
+            continue
+        if spec.LevelId not in level_ids:
+            result.update(Error=f"Unknown level id {spec.LevelId}")
+        elif spec.ViewTemplateId not in template_ids:
+            result.update(Error=f"Unknown view template id {spec.ViewTemplateId}")
+        elif spec.Name in taken:
+            result.update(Error=f"A view named {spec.Name} already exists")
+        else:
+            taken.add(spec.Name)
+            result.update(Success=True)
+
+    if DryRun:
+        report = FloorPlanReport(DryRun=True, Results=results)
+        return {"success": report.Failed == 0, "result": report}
+
+    client = get_client(revit_port)
+    url = client.url("/api/v1/views/floor-plan")
+    params = {"apiKey": api_key}
+    semaphore = asyncio.Semaphore(max(1, MaxConcurrency))
+
+    async def submit(spec: FloorPlanSpec, result: FloorPlanResult) -> None:
+        async with semaphore:
+            try:
+                data = spec.model_dump()
+                async with client.session.post(
+                    url, params=params, json=data
+                ) as response:
+                    if response.status == 200:
+                        result.update(View=await response.json())
+                    else:
+                        result.update(
+                            Success=False,
+                            Error=f"Failed to create floor plan. Status code: {response.status}",
+                        )
+            except Exception as e:
+                result.update(
+                    Success=False, Error=f"Error creating floor plan: {str(e)}"
+                )
+
+    await asyncio.gather(
+        *(
+            submit(spec, result)
+            for spec, result in zip(specs, results)
+            if result.Success
+        )
+    )
+
+    # Update the cache and the views in memory once for the whole batch
+    new_views = [result.View for result in results if result.Success]
+    if new_views:
+        response_cache.invalidate(revit_port, "/api/v1/views")
+        chat_memory.store_views([*chat_memory.get_views(), *new_views])
+
+    report = FloorPlanReport(Results=results)
+    response = {"success": report.Failed == 0, "result": report}
+    if report.Failed:
+        response["error"] = f"{report.Failed} of {report.Count} floor plans failed"
+    return response
 
-        # Prepare request body
-        data = {
-            "Name": Name,
-            "LevelId": LevelId,
-            "ViewTemplateId": ViewTemplateId,
-            "ScopeBoxId": ScopeBoxId,
-        }
 
+async def cached_view_ids(
+    settings: CTCSettings,
+) -> Tuple[Set[int], Set[int], Optional[str]]:
+    """Level and view template IDs from memory, fetched when not cached yet,
+    and the error of a fetch that failed"""
+    if not chat_memory.get_levels():
+        response = await get_levels(settings=settings)
+        if not response["success"]:
+            return set(), set(), response["error"]
+    if not chat_memory.get_view_templates():
+        client = get_client(settings.RevitPort)
         try:
-            async with session.post(url, params=params, json=data) as response:
-                if response.status == 200:
-                    new_view = await response.json()
-
-                    # Store in memory with existing views
-                    existing_views = chat_memory.get_views()
-                    if existing_views:
-                        existing_views.append(new_view)
-                        chat_memory.store_views(existing_views)
-
-                    return {"success": True, "result": new_view}
-                else:
-                    return {
-                        "success": False,
-                        "error": f"Failed to create floor plan. Status code: {response.status}",
-                    }
+            status, templates = await client.get_json(
+                "/api/v1/views/templates", params={"apiKey": settings.ApiKey}
+            )
         except Exception as e:
-            return {"success": False, "error": f"Error creating floor plan: {str(e)}"}
+            return set(), set(), f"Error fetching view templates: {str(e)}"
+        if status != 200:
+            return (
+                set(),
+                set(),
+                f"Failed to fetch view templates. Status code: {status}",
+            )
+        chat_memory.store_templates(templates)
+    level_ids = {level.get("id") for level in chat_memory.get_levels()}
+    template_ids = {template.get("id") for template in chat_memory.get_view_templates()}
+    return level_ids, template_ids, None
 
 
 # Prevent running from this file
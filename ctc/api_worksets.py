@@ -1,13 +1,12 @@
 """Core functions for CTC Chatbot to get Worksets from the Revit API"""
 # Depricated
 
-import os
 from datetime import datetime
-from typing import List, Dict, Any
-from dotenv import load_dotenv
-import aiohttp
+from typing import List, Dict, Any, Optional
 
 from core.tool_models import chat_memory
+from ctc.client import get_client
+from ctc.settings import CTCSettings, get_settings
 from ctc.data_models.families import RevitFamily, RevitFamilyType
 from ctc.data_models.categories import RevitCategory
 from ctc.data_models.sessions import RevitSession
@@ -20,41 +19,40 @@ async def get_worksets(
     *,
     session: RevitSession,
     category: RevitCategory,
+    settings: Optional[CTCSettings] = None,
 ) -> RevitCategory:
     """Get the worksets in the project"""
-    load_dotenv()
-    revit_port = os.getenv("REVIT_PORT")
-    api_key = os.getenv("CTC_API_KEY")
+    settings = settings or get_settings()
+    revit_port = settings.RevitPort
+    api_key = settings.ApiKey
     if not api_key:
         raise ValueError("CTC_API_KEY not found in environment variables")
 
-    async with aiohttp.ClientSession() as session:
-        url = f"http://localhost:{revit_port}/api/v1/worksets"
-        params = {"apiKey": api_key}
-
-        try:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    worksets = await response.json()
-
-                    # Enter View Templates into Category
-                    for workset in worksets:
-                        workset = RevitFamily.model_validate(workset)
-                        category.Families.append(workset)
-
-                    return {"success": True, "result": category}
-                else:
-                    return {
-                        "success": False,
-                        "result": category,
-                        "error": f"Failed to fetch view templates. Status code: {response.status}",
-                    }
-        except Exception as e:
+    client = get_client(revit_port)
+    path = "/api/v1/worksets"
+    params = {"apiKey": api_key}
+
+    try:
+        status, worksets = await client.get_json(path, params=params)
+        if status == 200:
+            # Enter View Templates into Category
+            for workset in worksets:
+                workset = RevitFamily.model_validate(workset)
+                category.add_family(workset)
+
+            return {"success": True, "result": category}
+        else:
             return {
                 "success": False,
                 "result": category,
-                "error": f"Error fetching view templates: {str(e)}",
+                "error": f"Failed to fetch view templates. Status code: {status}",
             }
+    except Exception as e:
+        return {
+            "success": False,
+            "result": category,
+            "error": f"Error fetching view templates: {str(e)}",
+        }
 
 
 # Prevent running from this file
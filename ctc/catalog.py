@@ -0,0 +1,191 @@
+"""Compiled Revit category catalog, read from the constants csv once
+
+The csv of every BuiltInCategory is compiled into an immutable CategoryCatalog
+indexed by id, EnumName and display name. The compiled rows are cached next
+to the csv as <name>.catalog.json and recompiled when the csv changes; in
+memory a catalog is kept per Revit version and only the csv mtime is checked
+on later calls.
+
+Catalog files are named Category_<version>.csv, a version without its own file
+uses the newest older one.
+"""
+
+import csv
+import json
+import os
+import re
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from ctc.data_models.categories import RevitCategories, RevitCategory
+
+CATALOG_FOLDER = os.path.join("ctc", "constants")
+CATALOG_PATTERN = re.compile(r"^Category_(\d+)\.csv$")
+CACHE_SUFFIX = ".catalog.json"
+CACHE_FORMAT = 1
+
+# Compiled catalogs by csv path, with the csv (mtime, size) they were read at
+_catalogs: Dict[str, Tuple[Tuple[float, int], "CategoryCatalog"]] = {}
+
+
+# Class Definitions
+class CategoryRecord(NamedTuple):
+    """One row of the catalog csv"""
+
+    Id: str
+    EnumName: str
+    Name: str
+    IsFamilyInstanceCreatable: bool
+    IsObsolete: bool
+    IsAnnotation: bool
+    IsFamilyFileCreatable: bool
+    IsVirtual: bool
+    ForLLM: bool
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str]) -> "CategoryRecord":
+        def flag(name: str) -> bool:
+            return row[name].strip().upper() == "TRUE"
+
+        return cls(
+            Id=row["ID"].strip(),
+            EnumName=row["EnumName"].strip(),
+            Name=row["DisplayName"].strip(),
+            IsFamilyInstanceCreatable=flag("IsFamilyInstanceCreatable"),
+            IsObsolete=flag("IsObsolete"),
+            IsAnnotation=flag("IsAnnotation"),
+            IsFamilyFileCreatable=flag("IsFamilyFileCreatable"),
+            IsVirtual=flag("IsVirtual"),
+            ForLLM=flag("ForLLM"),
+        )
+
+    def to_category(self) -> RevitCategory:
+        """A new category model without families, the record stays untouched"""
+        return RevitCategory.model_construct(
+            Id=self.Id,
+            Name=self.Name,
+            EnumName=self.EnumName,
+            IsFamilyInstanceCreatable=self.IsFamilyInstanceCreatable,
+            IsAnnotation=self.IsAnnotation,
+            IsFamilyFileCreatable=self.IsFamilyFileCreatable,
+            IsVirtual=self.IsVirtual,
+            Families=[],
+        )
+
+
+class CategoryCatalog:
+    """Immutable, indexed catalog of one Revit version"""
+
+    def __init__(self, version: str, records: Tuple[CategoryRecord, ...]):
+        self.version = version
+        self.records = records
+        self.active = tuple(r for r in records if not r.IsObsolete)
+        self.for_llm = tuple(r for r in self.active if r.ForLLM)
+        by_id: Dict[str, CategoryRecord] = {}
+        by_enum: Dict[str, CategoryRecord] = {}
+        by_name: Dict[str, CategoryRecord] = {}
+        # Active rows first so a name shared with an obsolete row finds the active one
+        for record in self.active + records:
+            by_id.setdefault(record.Id, record)
+            by_enum.setdefault(record.EnumName.casefold(), record)
+            by_name.setdefault(record.Name.casefold(), record)
+        self.by_id: Mapping[str, CategoryRecord] = MappingProxyType(by_id)
+        self.by_enum: Mapping[str, CategoryRecord] = MappingProxyType(by_enum)
+        self.by_name: Mapping[str, CategoryRecord] = MappingProxyType(by_name)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    # Record by id (e.g. -2000023), EnumName (OST_Doors) or display name
+    def get(self, key: object) -> Optional[CategoryRecord]:
+        text = str(key).strip()
+        return (
+            self.by_id.get(text)
+            or self.by_enum.get(text.casefold())
+            or self.by_name.get(text.casefold())
+        )
+
+    def categories(self, for_llm: bool = True) -> RevitCategories:
+        """New category models of the LLM or of all active rows"""
+        # The lookup indexes of RevitCategories build on first use
+        records = self.for_llm if for_llm else self.active
+        return RevitCategories.model_construct(
+            Categories=[record.to_category() for record in records]
+        )
+
+
+# Functions
+def catalog_path(version: str = "", folder: str = CATALOG_FOLDER) -> str:
+    """Csv of the Revit version, the newest older one when it has none and the
+    newest of all without a version"""
+    versions = {}
+    for name in os.listdir(folder):
+        match = CATALOG_PATTERN.match(name)
+        if match:
+            versions[int(match.group(1))] = os.path.join(folder, name)
+    if not versions:
+        raise FileNotFoundError(f"No Category_<version>.csv in {folder}")
+    wanted = int(version) if str(version).isdigit() else max(versions)
+    older = [v for v in versions if v <= wanted]
+    return versions[max(older) if older else min(versions)]
+
+
+def get_catalog(version: str = "", folder: str = CATALOG_FOLDER) -> CategoryCatalog:
+    """Compiled catalog of the Revit version, from memory while the csv is
+    unchanged, else from the disk cache, else compiled from the csv"""
+    path = catalog_path(version, folder)
+    stat = os.stat(path)
+    source = (stat.st_mtime, stat.st_size)
+    cached = _catalogs.get(path)
+    if cached is not None and cached[0] == source:
+        return cached[1]
+
+    version = CATALOG_PATTERN.match(os.path.basename(path)).group(1)
+    records = read_cache(path, source)
+    if records is None:
+        records = compile_catalog(path)
+        write_cache(path, source, records)
+    catalog = CategoryCatalog(version, records)
+    _catalogs[path] = (source, catalog)
+    return catalog
+
+
+def compile_catalog(path: str) -> Tuple[CategoryRecord, ...]:
+    """Parses the catalog csv"""
+    with open(path, "r", newline="") as open_file:
+        return tuple(CategoryRecord.from_row(row) for row in csv.DictReader(open_file))
+
+
+def read_cache(
+    path: str, source: Tuple[float, int]
+) -> Optional[Tuple[CategoryRecord, ...]]:
+    """Compiled rows of the csv, None when the cache is missing or stale"""
+    try:
+        with open(path + CACHE_SUFFIX, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cache.get("Format") != CACHE_FORMAT or cache.get("Source") != list(source):
+        return None
+    return tuple(CategoryRecord(*row) for row in cache["Rows"])
+
+
+def write_cache(
+    path: str, source: Tuple[float, int], records: Tuple[CategoryRecord, ...]
+) -> None:
+    """Writes the compiled rows next to the csv, skipped when it is read-only"""
+    cache = {
+        "Format": CACHE_FORMAT,
+        "Source": list(source),
+        "Rows": [list(record) for record in records],
+    }
+    try:
+        with open(path + CACHE_SUFFIX, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,210 @@
+"""Pooled HTTP client for the CTC API, shared by every ctc/api_* function"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Awaitable, Dict, Tuple, Any, Optional, Set
+
+import aiohttp
+
+from ctc.response_cache import STALE, response_cache
+from ctc.single_flight import SingleFlight
+
+# Pool limits used for every new client, change with configure_pool()
+POOL_LIMITS: Dict[str, Any] = {
+    "limit": 32,  # total open connections per client
+    "limit_per_host": 8,  # the Revit add-in is a single host per port
+    "keepalive_timeout": 60.0,  # seconds an idle connection is kept open
+    "total_timeout": 300.0,  # seconds for a full request, large categories are slow
+}
+
+# Clients keyed by (port, event loop id)
+_clients: Dict[Tuple[int, int], "CTCClient"] = {}
+
+# Identical GETs in flight at the same time share one request, across all clients
+_single_flight = SingleFlight()
+
+# Stale-while-revalidate refreshes, referenced until they finish
+_background_tasks: Set[asyncio.Task] = set()
+
+# Long lived loop running the calls of synchronous callers, see run_sync
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+# Class Definitions
+class CTCClient:
+    """Long lived aiohttp session with keep-alive connections to one Revit port"""
+
+    def __init__(self, port: int, **limits):
+        self.port = int(port)
+        self.base_url = f"http://localhost:{self.port}"
+        self.loop = asyncio.get_running_loop()
+        connector = aiohttp.TCPConnector(
+            limit=limits["limit"],
+            limit_per_host=limits["limit_per_host"],
+            keepalive_timeout=limits["keepalive_timeout"],
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=limits["total_timeout"]),
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    def url(self, path: str) -> str:
+        """Full url for an api path, e.g. /api/v1/views"""
+        return f"{self.base_url}{path}"
+
+    async def get_json(
+        self, path: str, params: Optional[Dict[str, Any]] = None, use_cache: bool = True
+    ) -> Tuple[int, Any]:
+        """GET an api path, returns (status, parsed json or None when not 200).
+        Paths with a TTL in response_cache.ENDPOINT_TTLS are served from the cache,
+        stale entries are returned at once and refreshed in the background.
+        Concurrent identical requests (port, path, params) share one round trip.
+        Results are shared between callers, so they must not be mutated."""
+        params = params or {}
+        params_key = tuple(sorted((k, str(v)) for k, v in params.items()))
+        ttl = response_cache.ttl_for(path) if use_cache else None
+        if ttl:
+            cached, state = response_cache.lookup(
+                response_cache.key(self.port, path, params_key)
+            )
+            if state == STALE:
+                self._revalidate(path, params, params_key, ttl)
+            if state:
+                return cached
+        return await self._fetch(path, params, params_key, ttl)
+
+    async def _fetch(
+        self, path: str, params: Dict[str, Any], params_key: tuple, ttl: Optional[float]
+    ) -> Tuple[int, Any]:
+        async def call() -> Tuple[int, Any]:
+            async with self.session.get(self.url(path), params=params) as response:
+                if response.status != 200:
+                    return response.status, None
+                result = (response.status, await response.json())
+            if ttl:
+                cache_key = response_cache.key(self.port, path, params_key)
+                response_cache.store(cache_key, result, ttl)
+            return result
+
+        return await _single_flight.do((self.port, path, params_key), call)
+
+    def _revalidate(
+        self, path: str, params: Dict[str, Any], params_key: tuple, ttl: float
+    ) -> None:
+        """Refreshes a stale cache entry without blocking the caller"""
+
+        async def refresh() -> None:
+            try:
+                await self._fetch(path, params, params_key, ttl)
+            except Exception as e:
+                logging.info(f"Background refresh of {path} failed: {str(e)}")
+
+        task = self.loop.create_task(refresh())
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def close(self) -> None:
+        """Close the session and every pooled connection"""
+        if not self.session.closed:
+            await self.session.close()
+
+
+# Functions
+def configure_pool(**limits) -> Dict[str, Any]:
+    """Update the pool limits used for clients created from now on"""
+    for key, value in limits.items():
+        if key not in POOL_LIMITS:
+            raise ValueError(f"Unknown pool limit: {key}")
+        POOL_LIMITS[key] = value
+    return dict(POOL_LIMITS)
+
+
+def get_client(port: int) -> CTCClient:
+    """Returns the pooled client for a Revit port, creating it on first use.
+    aiohttp sessions are bound to an event loop, so each running loop gets its own
+    client. Synchronous callers should use run_sync so every call shares one loop;
+    clients left behind by loops that ended without close_clients are dropped."""
+    loop = asyncio.get_running_loop()
+    for key in [k for k, c in _clients.items() if c.loop.is_closed()]:
+        del _clients[key]
+
+    key = (int(port), id(loop))
+    client = _clients.get(key)
+    if client is None or client.closed or client.loop is not loop:
+        client = CTCClient(port, **POOL_LIMITS)
+        _clients[key] = client
+    return client
+
+
+def request_stats() -> Dict[str, Any]:
+    """Single-flight counters (GET calls that reached the coalescing layer and how
+    many were deduplicated) and the response cache hit and miss counters"""
+    stats: Dict[str, Any] = _single_flight.stats()
+    stats["cache"] = response_cache.stats()
+    return stats
+
+
+async def close_clients() -> None:
+    """Shutdown hook, closes every client owned by the running event loop.
+    Call it before the loop ends (end of a crawl, app shutdown)."""
+    loop = asyncio.get_running_loop()
+    for key, client in list(_clients.items()):
+        if client.loop is loop:
+            await client.close()
+            del _clients[key]
+
+
+def run_sync(coroutine: Awaitable[Any]) -> Any:
+    """Runs a coroutine on the long lived background loop and waits for its
+    result. Synchronous callers (the Streamlit app) use it instead of
+    asyncio.run, so the pooled clients and their connections outlive a call"""
+    return asyncio.run_coroutine_threadsafe(coroutine, background_loop()).result()
+
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """The loop of run_sync, started on first use in a daemon thread and shut
+    down at interpreter exit"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_run_loop, args=(_loop,), name="ctc-client-loop", daemon=True
+            ).start()
+            atexit.register(shutdown_background_loop)
+        return _loop
+
+
+def shutdown_background_loop(timeout: float = 5.0) -> None:
+    """Shutdown hook, closes the clients of the background loop and stops it"""
+    global _loop
+    with _loop_lock:
+        loop, _loop = _loop, None
+    if loop is None or loop.is_closed():
+        return
+    atexit.unregister(shutdown_background_loop)
+    try:
+        asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout)
+    except Exception as e:
+        logging.info(f"Closing the clients failed: {str(e)}")
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
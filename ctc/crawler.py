@@ -0,0 +1,144 @@
+"""Full project crawler, fetches the families and elements of every category concurrently
+
+Run from the repository root:
+    python -m ctc.crawler --concurrency 4 --timeout 120
+
+The project is written as a binary snapshot folder (see ctc.snapshot), add
+--json to also write the single json file.
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from ctc.api_categories import get_categories
+from ctc.api_elements import get_elements
+from ctc.api_famlies import get_families
+from ctc.api_sessions import get_active_session
+from ctc.client import close_clients
+from ctc.data_models.categories import RevitCategories, RevitCategory
+from ctc.data_models.sessions import RevitSession
+from ctc.settings import CTCSettings, get_settings
+from ctc.snapshot import write_snapshot
+from utils.file_utils import directory_create
+
+# on_progress(done, total, category, error) is called once per finished category
+ProgressCallback = Callable[[int, int, RevitCategory, Optional[str]], None]
+
+
+# Functions
+async def crawl_category(
+    *,
+    session: RevitSession,
+    category: RevitCategory,
+    settings: CTCSettings,
+) -> Optional[str]:
+    """Fetches the families, then the elements of one category in place.
+    Returns the error messages of the failed calls, None on success"""
+    families = await get_families(session=session, category=category, settings=settings)
+    elements = await get_elements(
+        session=session, category=category, settings=settings, stream=True
+    )
+    errors = [r["error"] for r in (families, elements) if not r["success"]]
+    return "; ".join(errors) if errors else None
+
+
+async def crawl_project(
+    session: Optional[RevitSession] = None,
+    *,
+    settings: Optional[CTCSettings] = None,
+    categories: Optional[RevitCategories] = None,
+    concurrency: int = 4,
+    timeout: float = 120.0,
+    on_progress: Optional[ProgressCallback] = None,
+) -> RevitCategories:
+    """Crawls every category of the active project with at most `concurrency`
+    categories in flight. A category taking longer than `timeout` seconds is left
+    with whatever was fetched so far and reported as an error to on_progress.
+    Raises ValueError when there is no active Revit session."""
+    settings = settings or get_settings()
+    session = session or await get_active_session()
+    if session is None:
+        raise ValueError(f"No active Revit session on port {settings.RevitPort}")
+    project = categories or await get_categories()
+    semaphore = asyncio.Semaphore(concurrency)
+    total = project.Count
+    done = 0
+
+    async def run(category: RevitCategory) -> None:
+        nonlocal done
+        async with semaphore:
+            try:
+                error = await asyncio.wait_for(
+                    crawl_category(
+                        session=session, category=category, settings=settings
+                    ),
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                error = f"Timed out after {timeout}s"
+            except Exception as e:
+                error = f"Error crawling category: {str(e)}"
+        done += 1
+        if on_progress:
+            on_progress(done, total, category, error)
+
+    await asyncio.gather(*(run(category) for category in project.Categories))
+    return project
+
+
+def print_progress(
+    done: int, total: int, category: RevitCategory, error: Optional[str]
+) -> None:
+    """Default progress callback for the command line"""
+    status = error if error else f"{category.FamilyCount} families"
+    print(f"[{done}/{total}] {category.Name}: {status}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        start = time.perf_counter()
+        session = await get_active_session()
+        if session is None:
+            raise SystemExit(
+                f"No active Revit session on port {get_settings().RevitPort}"
+            )
+        project = await crawl_project(
+            session,
+            concurrency=args.concurrency,
+            timeout=args.timeout,
+            on_progress=print_progress,
+        )
+        print(
+            f"Crawled {project.Count} categories in {time.perf_counter() - start:.1f}s"
+        )
+    finally:
+        await close_clients()
+
+    sub_folder = datetime.now().strftime("%Y%m%d")
+    file_name = f"{session.Port}_{session.RevitVersion}_{session.ActiveProject}"
+    manifest = write_snapshot(
+        project,
+        directory_create(folder=f"{sub_folder}\\{file_name}"),
+        name=session.ActiveProject,
+        json_export=args.json,
+    )
+    print(f"Wrote {sum(c['Bytes'] for c in manifest['Categories'])} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Snapshot every category of the active Revit project"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="categories fetched at once"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=120.0, help="seconds allowed per category"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="also write the snapshot as one json file"
+    )
+    asyncio.run(main(parser.parse_args()))
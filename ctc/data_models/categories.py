@@ -1,12 +1,20 @@
 """Revit Categories data model"""
 
-from pydantic import BaseModel, Field, computed_field, AliasChoices
-from typing import List, Optional
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, AliasChoices
+from typing import Any, Dict, Hashable, List, Optional, Tuple
 
-from ctc.data_models.common import LocalBaseModel
+from ctc.data_models.common import KeyIndex, LocalBaseModel, item_key
 from ctc.data_models.families import RevitFamily
 from ctc.data_models.family_types import RevitFamilyType
-from ctc.data_models.parameters import ParameterSimple, StorageLocation
+from ctc.data_models.elements import RevitElement
+from ctc.data_models.parameters import (
+    Parameter,
+    ParameterCatalog,
+    ParameterSimple,
+    StorageLocation,
+    dump_definitions,
+)
+
 # Class Definitions
 
 
@@ -15,11 +23,18 @@ class RevitCategory(BaseModel):
 
     Id: str = Field(alias="ID")
     Name: str = Field(alias="DisplayName")
+    EnumName: str = Field(default="", exclude=True)
     IsFamilyInstanceCreatable: bool = Field(exclude=True)
     IsAnnotation: bool = Field(exclude=True)
     IsFamilyFileCreatable: bool = Field(exclude=True)
     IsVirtual: bool = Field(exclude=True)
     Families: Optional[List[RevitFamily]] = Field(default=[])
+    _family_index: KeyIndex = PrivateAttr(default_factory=KeyIndex)
+    # (Id, Name) of a type -> (family index, type index) of its last lookup
+    _type_positions: Dict[Hashable, Tuple[int, int]] = PrivateAttr(default_factory=dict)
+    _parameters: ParameterCatalog = PrivateAttr(default_factory=ParameterCatalog)
+    # Element id -> fingerprint of the element as last fetched
+    _fingerprints: Dict[int, int] = PrivateAttr(default_factory=dict)
 
     @computed_field
     @property
@@ -30,33 +45,32 @@ class RevitCategory(BaseModel):
     @computed_field
     @property
     def ParameterList(self) -> List[ParameterSimple]:
-        parameters = []
+        return self.parameter_catalog().values()
+
+    # Cached parameter catalog, rebuilt when the tree changed behind its back
+    def parameter_catalog(self) -> ParameterCatalog:
+        catalog = self._parameters
+        signature = self.tree_signature()
+        if catalog.signature != signature:
+            catalog.clear()
+            for family in self.Families:
+                catalog.add(family.Parameters, "Family")
+                for type in family.Types:
+                    catalog.add(type.Parameters, "Type")
+                    for element in type.Instances:
+                        catalog.add(element.Parameters, "Instance")
+            catalog.signature = signature
+        return catalog
+
+    # Family, type and instance counts of the category
+    def tree_signature(self) -> Tuple[int, int, int]:
+        types = 0
+        instances = 0
         for family in self.Families:
-            for parameter in family.Parameters:
-                if not self.has_parameter(parameters, parameter):
-                    simple_parameter = ParameterSimple(
-                        Id=parameter.Id, Name=parameter.Name, StoredIn="Family"
-                    )
-                    parameters.append(simple_parameter)
+            types += len(family.Types)
             for type in family.Types:
-                for parameter in type.Parameters:
-                    if not self.has_parameter(parameters, parameter):
-                        simple_parameter = ParameterSimple(
-                            Id=parameter.Id,
-                            Name=parameter.Name,
-                            StoredIn="Type",
-                        )
-                        parameters.append(simple_parameter)
-                for element in type.Instances:
-                    for parameter in element.Parameters:
-                        if not self.has_parameter(parameters, parameter):
-                            simple_parameter = ParameterSimple(
-                                Id=parameter.Id,
-                                Name=parameter.Name,
-                                StoredIn="Instance",
-                            )
-                            parameters.append(simple_parameter)
-        return parameters
+                instances += len(type.Instances)
+        return len(self.Families), types, instances
 
     # Check to see if the parameter exists in the parameters list
     def has_parameter(
@@ -65,43 +79,135 @@ class RevitCategory(BaseModel):
         parameter: ParameterSimple,
     ) -> bool:
         for param in param_list:
-            if param == parameter:
+            if param.Id == parameter.Id:
                 return True
         return False
 
     # Get the parameter by name
     def get_parameter_by_name(self, name: str) -> ParameterSimple:
-        for parameter in self.ParameterList:
-            if parameter.Name.lower() == name.lower():
-                return parameter
-        return None
+        return self.parameter_catalog().by_name.get(name.casefold())
+
+    # Get the parameter by id
+    def get_parameter_by_id(self, id: int) -> ParameterSimple:
+        return self.parameter_catalog().by_id.get(id)
 
     # Check to see if the family exists in the category's families list
     def has_family(self, family: RevitFamily) -> bool:
-        for family_self in self.Families:
-            if (family_self.Id == family.Id) and (family_self.Name == family.Name):
-                return True
-        return False
+        return self.get_family_index(family) != -1
 
     # Get the index of the family in the category's families list
     def get_family_index(self, family: RevitFamily) -> int:
-        for i, family_self in enumerate(self.Families):
-            if (family_self.Id == family.Id) and (family_self.Name == family.Name):
-                return i
-        return -1
+        return self.find_family(item_key(family))
+
+    # Get the index of the family with the (Id, Name) key
+    def find_family(self, key: Hashable) -> int:
+        return self._family_index.find(self.Families, key)
+
+    # Add the family to the category's families list, keeping the index current
+    def add_family(self, family: RevitFamily) -> int:
+        fam_i = self._family_index.append(self.Families, family)
+        if self._parameters.signature is not None:
+            self._parameters.add(family.Parameters, "Family")
+            for type in family.Types:
+                self._parameters.add(type.Parameters, "Type")
+                for element in type.Instances:
+                    self._parameters.add(element.Parameters, "Instance")
+            self._grow_signature(
+                1,
+                len(family.Types),
+                sum(len(type.Instances) for type in family.Types),
+            )
+        return fam_i
+
+    # Add the type to a family of the category, keeping the indexes current
+    def add_type(self, fam_i: int, type: RevitFamilyType) -> int:
+        type_i = self.Families[fam_i].add_type(type)
+        self._type_positions.setdefault(item_key(type), (fam_i, type_i))
+        if self._parameters.signature is not None:
+            self._parameters.add(type.Parameters, "Type")
+            for element in type.Instances:
+                self._parameters.add(element.Parameters, "Instance")
+            self._grow_signature(0, 1, len(type.Instances))
+        return type_i
+
+    # Replace the parameters of a type when they changed, True when they did
+    def update_type_parameters(
+        self, fam_i: int, type_i: int, parameters: List[Parameter]
+    ) -> bool:
+        family_type = self.Families[fam_i].Types[type_i]
+        if family_type.Parameters == parameters:
+            return False
+        family_type.Parameters = parameters
+        # The catalog may hold parameters the type no longer has
+        self._parameters.clear()
+        return True
+
+    # Add or replace an instance of a family type, keeping the indexes current
+    def merge_instance(self, fam_i: int, type_i: int, element: RevitElement) -> int:
+        family_type = self.Families[fam_i].Types[type_i]
+        elem_i = family_type.get_instance_index(element)
+        if elem_i == -1:
+            elem_i = family_type.add_instance(element)
+            self._grow_signature(0, 0, 1)
+        else:
+            family_type.Instances[elem_i] = element
+        if self._parameters.signature is not None:
+            self._parameters.add(element.Parameters, "Instance")
+        return elem_i
+
+    # Drop the given instances, each affected type list is filtered once
+    def remove_instances(self, elements: List[RevitElement]) -> None:
+        stale = {id(element) for element in elements}
+        for family in self.Families:
+            for type in family.Types:
+                if any(id(element) in stale for element in type.Instances):
+                    type.Instances = [e for e in type.Instances if id(e) not in stale]
+        # A removed instance may have carried the last use of a parameter
+        self._parameters.clear()
+
+    # Element id -> (family index, type index, element) of every instance
+    def instance_map(self) -> Dict[int, Tuple[int, int, RevitElement]]:
+        instances = {}
+        for fam_i, family in enumerate(self.Families):
+            for type_i, type in enumerate(family.Types):
+                for element in type.Instances:
+                    instances.setdefault(element.Id, (fam_i, type_i, element))
+        return instances
+
+    # Element id -> fingerprint of the element as last fetched, see refresh_elements
+    def fingerprints(self) -> Dict[int, int]:
+        return self._fingerprints
+
+    def _grow_signature(self, families: int, types: int, instances: int) -> None:
+        """Moves the catalog signature along with an incremental update"""
+        if self._parameters.signature is not None:
+            f, t, i = self._parameters.signature
+            self._parameters.signature = (f + families, t + types, i + instances)
 
     # Deep check for family type in the category's families list
     def has_type(self, type: RevitFamilyType) -> bool:
-        for family in self.Families:
-            if family.has_type(type):
-                return True
-        return False
+        return self.get_fam_type_index(type) != (-1, -1)
 
     # Get the index for both family and type in the category's families list
     def get_fam_type_index(self, type: RevitFamilyType) -> (int, int):
+        return self.find_type(item_key(type))
+
+    # Get the family and type index of the type with the (Id, Name) key
+    def find_type(self, key: Hashable) -> (int, int):
+        fam_i, type_i = self._type_positions.get(key, (-1, -1))
+        if (
+            fam_i != -1
+            and fam_i < len(self.Families)
+            and self.Families[fam_i].find_type(key) == type_i
+        ):
+            return fam_i, type_i
+        # Unknown or moved type, look through the family indexes
         for i, family in enumerate(self.Families):
-            if family.has_type(type):
-                return i, family.get_type_index(type)
+            type_i = family.find_type(key)
+            if type_i != -1:
+                self._type_positions[key] = (i, type_i)
+                return i, type_i
+        self._type_positions.pop(key, None)
         return -1, -1
 
 
@@ -110,6 +216,14 @@ class RevitCategories(LocalBaseModel):
 
     # Count_: int = Field(default=0, repr=False)
     Categories: List[RevitCategory] = []
+    _key_index: KeyIndex = PrivateAttr(default_factory=KeyIndex)
+    _id_index: KeyIndex = PrivateAttr(default_factory=lambda: KeyIndex(lambda c: c.Id))
+    _enum_index: KeyIndex = PrivateAttr(
+        default_factory=lambda: KeyIndex(lambda c: c.EnumName)
+    )
+    _name_index: KeyIndex = PrivateAttr(
+        default_factory=lambda: KeyIndex(lambda c: c.Name.casefold())
+    )
 
     @computed_field
     @property
@@ -118,28 +232,44 @@ class RevitCategories(LocalBaseModel):
 
     # Check to see if the category exists in the categories list
     def has_category(self, category: RevitCategory) -> bool:
-        for category_self in self.Categories:
-            if (category_self.Id == category.Id) and (
-                category_self.Name == category.Name
-            ):
-                return True
-        return False
+        return self.get_category_index(category) != -1
 
     # Get the index of the category in the categories list
     def get_category_index(self, category: RevitCategory) -> int:
-        for i, category_self in enumerate(self.Categories):
-            if (category_self.Id == category.Id) and (
-                category_self.Name == category.Name
-            ):
-                return i
-        return -1
+        return self._key_index.find(self.Categories, item_key(category))
+
+    # Add the category to the categories list, keeping the indexes current
+    def add_category(self, category: RevitCategory) -> int:
+        i = self._key_index.append(self.Categories, category)
+        for index in (self._id_index, self._enum_index, self._name_index):
+            index.appended(self.Categories)
+        return i
 
     # Get Category by Name
     def get_category_by_name(self, name: str) -> RevitCategory:
-        for category in self.Categories:
-            if category.Name.lower() == name.lower():
-                return category
-        return None
+        return self._lookup(self._name_index, name.casefold())
+
+    # Get Category by Id, e.g. -2000023 for doors
+    def get_category_by_id(self, id: Any) -> RevitCategory:
+        return self._lookup(self._id_index, str(id))
+
+    # Get Category by its BuiltInCategory name, e.g. OST_Doors
+    def get_category_by_enum(self, enum_name: str) -> RevitCategory:
+        if not enum_name:
+            return None
+        return self._lookup(self._enum_index, enum_name)
+
+    def _lookup(self, index: KeyIndex, key: Hashable) -> Optional[RevitCategory]:
+        i = index.find(self.Categories, key)
+        return self.Categories[i] if i != -1 else None
+
+    # Dump with each parameter definition written once, parameters refer to
+    # their definition by its position in ParameterDefinitions
+    def snapshot(self) -> Dict[str, Any]:
+        definitions = {}
+        dump = self.model_dump(context={"definitions": definitions})
+        dump["ParameterDefinitions"] = dump_definitions(definitions)
+        return dump
 
 
 # Prevent running from this file
@@ -0,0 +1,132 @@
+"""Element change set data models, what a category re-fetch changed"""
+
+from enum import Enum
+from typing import Any, Dict, Hashable, List, Optional
+
+from pydantic import computed_field
+
+from ctc.data_models.common import LocalBaseModel
+from ctc.data_models.elements import RevitElement
+
+
+# Class Definitions
+class ChangeKind(str, Enum):
+    """How an element differs from the previous fetch"""
+
+    ADDED = "added"
+    REMOVED = "removed"
+    MODIFIED = "modified"
+
+
+class ParameterChange(LocalBaseModel):
+    """A parameter value that differs, None when the parameter is new or gone"""
+
+    Id: int
+    Name: str
+    Old: Any = None
+    New: Any = None
+
+
+class ElementChange(LocalBaseModel):
+    """One added, removed or modified element"""
+
+    ElementId: int
+    Name: str
+    Change: ChangeKind
+    Type: Optional[str] = None  # the type name, the new one when it changed
+    Parameters: List[ParameterChange] = []
+
+
+class ChangeSet(LocalBaseModel):
+    """Changes of a category since its previous fetch"""
+
+    CategoryId: str
+    CategoryName: str
+    Changes: List[ElementChange] = []
+    Unchanged: int = 0  # elements skipped because their fingerprint matched
+    Seconds: float = 0.0
+
+    @computed_field
+    @property
+    def Added(self) -> int:
+        return sum(1 for c in self.Changes if c.Change == ChangeKind.ADDED)
+
+    @computed_field
+    @property
+    def Removed(self) -> int:
+        return sum(1 for c in self.Changes if c.Change == ChangeKind.REMOVED)
+
+    @computed_field
+    @property
+    def Modified(self) -> int:
+        return sum(1 for c in self.Changes if c.Change == ChangeKind.MODIFIED)
+
+
+# Functions
+def element_fingerprint(element: RevitElement, type_key: Hashable) -> int:
+    """Hash of an element's name, type and parameter values"""
+    return hash(
+        (
+            element.Name,
+            type_key,
+            tuple(
+                (
+                    p.Id,
+                    p.HasValue,
+                    p.ValueAsString,
+                    p.ValueAsElementId,
+                    p.ValueAsInteger,
+                    p.ValueAsDouble,
+                )
+                for p in element.Parameters
+            ),
+        )
+    )
+
+
+def raw_fingerprint(element: Dict[str, Any], type_key: Hashable) -> int:
+    """element_fingerprint of an api dict, without building the model"""
+    return hash(
+        (
+            element.get("name"),
+            type_key,
+            tuple(
+                (
+                    p.get("id"),
+                    p.get("hasValue"),
+                    p.get("valueAsString"),
+                    p.get("valueAsElementId"),
+                    p.get("valueAsInt"),
+                    p.get("valueAsDouble"),
+                )
+                for p in element.get("parameters") or []
+            ),
+        )
+    )
+
+
+def parameter_changes(old: RevitElement, new: RevitElement) -> List[ParameterChange]:
+    """Parameters whose value differs between two versions of an element"""
+    old_parameters = {p.Id: p for p in old.Parameters}
+    changes = []
+    for parameter in new.Parameters:
+        previous = old_parameters.pop(parameter.Id, None)
+        if previous is None or previous != parameter:
+            changes.append(
+                ParameterChange(
+                    Id=parameter.Id,
+                    Name=parameter.Name,
+                    Old=previous.Value if previous else None,
+                    New=parameter.Value,
+                )
+            )
+    for parameter in old_parameters.values():
+        changes.append(
+            ParameterChange(Id=parameter.Id, Name=parameter.Name, Old=parameter.Value)
+        )
+    return changes
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,344 @@
+"""Columnar element and parameter store, a compact alternative to the model tree
+
+A RevitCategory holds every instance parameter as a Parameter model, millions
+of python objects for a large category. ElementColumns keeps the instances as
+numpy arrays instead: element ids, names and type indices, and per instance
+parameter a typed value column with null masks. Families and types are few and
+stay models, without their instances.
+"""
+
+import sys
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ctc.data_models.categories import RevitCategory
+from ctc.data_models.elements import RevitElement
+from ctc.data_models.families import RevitFamily
+from ctc.data_models.family_types import RevitFamilyType
+from ctc.data_models.parameters import Parameter, ParameterDefinition
+
+# Numpy dtype of the typed value column, per parameter storage type
+VALUE_DTYPES: Dict[str, Any] = {
+    "Integer": np.int64,
+    "Double": np.float64,
+    "ElementId": np.int64,
+}
+
+# Model field holding the typed value, per parameter storage type
+VALUE_FIELDS: Dict[str, str] = {
+    "Integer": "ValueAsInteger",
+    "Double": "ValueAsDouble",
+    "ElementId": "ValueAsElementId",
+}
+
+
+# Class Definitions
+class StringColumn:
+    """Dictionary encoded strings, a code of -1 is None"""
+
+    def __init__(self, size: int):
+        self.codes = np.full(size, -1, dtype=np.int32)
+        self.table: List[str] = []
+        self._lookup: Optional[Dict[str, int]] = {}
+
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, table: List[str]) -> "StringColumn":
+        """Column over existing codes and their string table"""
+        column = cls(0)
+        column.codes = codes
+        column.table = table
+        column._lookup = None  # built on first use
+        return column
+
+    # String -> code lookup of the table
+    def lookup(self) -> Dict[str, int]:
+        if self._lookup is None:
+            self._lookup = {value: code for code, value in enumerate(self.table)}
+        return self._lookup
+
+    def set(self, i: int, value: Optional[str]) -> None:
+        if value is None:
+            self.codes[i] = -1
+            return
+        lookup = self.lookup()
+        code = lookup.get(value)
+        if code is None:
+            code = len(self.table)
+            self.table.append(value)
+            lookup[value] = code
+        self.codes[i] = code
+
+    def __getitem__(self, i: int) -> Optional[str]:
+        code = self.codes[i]
+        return None if code == -1 else self.table[code]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def equals(self, value: str) -> np.ndarray:
+        """Mask of the rows holding the string"""
+        code = self.lookup().get(value)
+        if code is None:
+            return np.zeros(len(self.codes), dtype=bool)
+        return self.codes == code
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + sum(sys.getsizeof(s) for s in self.table)
+
+
+class ParameterColumn:
+    """One instance parameter across all elements of a category.
+    present marks the elements carrying the parameter, null the ones without a
+    typed value. String parameters keep their value in strings only."""
+
+    def __init__(self, definition: ParameterDefinition, size: int):
+        self.Definition = definition
+        self.Id = definition.Id
+        self.Name = definition.Name
+        self.StorageType = definition.StorageType
+        self.present = np.zeros(size, dtype=bool)
+        self.has_value = np.zeros(size, dtype=bool)
+        self.null = np.ones(size, dtype=bool)
+        dtype = VALUE_DTYPES.get(self.StorageType)
+        self.values = None if dtype is None else np.zeros(size, dtype=dtype)
+        self.strings = StringColumn(size)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        definition: ParameterDefinition,
+        present: np.ndarray,
+        has_value: np.ndarray,
+        null: np.ndarray,
+        values: Optional[np.ndarray],
+        strings: StringColumn,
+    ) -> "ParameterColumn":
+        """Column over existing arrays, e.g. read from a snapshot"""
+        column = cls(definition, 0)
+        column.present = present
+        column.has_value = has_value
+        column.null = null
+        column.values = values
+        column.strings = strings
+        return column
+
+    def set(self, i: int, parameter: Parameter) -> None:
+        self.present[i] = True
+        self.has_value[i] = parameter.HasValue
+        self.strings.set(i, parameter.ValueAsString)
+        if self.values is None:
+            self.null[i] = parameter.ValueAsString is None
+            return
+        value = getattr(parameter, VALUE_FIELDS[self.StorageType])
+        if value is not None:
+            self.values[i] = value
+            self.null[i] = False
+
+    def parameter_at(self, i: int) -> Optional[Parameter]:
+        """The parameter model of one element, None when it does not carry it"""
+        if not self.present[i]:
+            return None
+        values = {
+            "ValueAsString": self.strings[i],
+            "ValueAsElementId": None,
+            "ValueAsInteger": None,
+            "ValueAsDouble": None,
+        }
+        if self.values is not None and not self.null[i]:
+            values[VALUE_FIELDS[self.StorageType]] = self.values[i].item()
+        return Parameter(self.Definition, bool(self.has_value[i]), **values)
+
+    def value_at(self, i: int) -> Any:
+        """Typed value of one element, like Parameter.Value"""
+        if self.null[i]:
+            return None
+        if self.values is None:
+            return self.strings[i]
+        return self.values[i].item()
+
+    def numeric(self) -> np.ma.MaskedArray:
+        """Typed values masked where there is no value, for numeric storage types"""
+        if self.values is None:
+            raise TypeError(f"Parameter {self.Name} stores {self.StorageType} values")
+        return np.ma.masked_array(self.values, mask=self.null)
+
+    def equals(self, value: Any) -> np.ndarray:
+        """Mask of the elements whose value equals the given one"""
+        if self.values is None:
+            return self.strings.equals(str(value)) & ~self.null
+        return (self.values == value) & ~self.null
+
+    @property
+    def nbytes(self) -> int:
+        size = (
+            self.present.nbytes
+            + self.has_value.nbytes
+            + self.null.nbytes
+            + self.strings.nbytes
+        )
+        if self.values is not None:
+            size += self.values.nbytes
+        return size
+
+
+class ElementColumns:
+    """Columnar store of the instances of a category, converts to and from
+    the RevitCategory tree"""
+
+    def __init__(
+        self,
+        category: RevitCategory,
+        families: List[RevitFamily],
+        types: List[RevitFamilyType],
+        type_family: np.ndarray,
+        ids: np.ndarray,
+        names: StringColumn,
+        type_index: np.ndarray,
+        parameters: Dict[int, ParameterColumn],
+    ):
+        self.category = category  # header only, no families
+        self.families = families  # without types
+        self.types = types  # without instances
+        self.type_family = type_family  # family index of each type
+        self.ids = ids
+        self.names = names
+        self.type_index = type_index  # type index of each element
+        self.parameters = parameters  # by parameter id, in order of appearance
+        self._by_name = {}
+        for column in parameters.values():
+            self._by_name.setdefault(column.Name.casefold(), column)
+
+    @classmethod
+    def from_category(cls, category: RevitCategory) -> "ElementColumns":
+        size = sum(t.InstanceCount for f in category.Families for t in f.Types)
+        families = []
+        types = []
+        type_family = []
+        ids = np.zeros(size, dtype=np.int64)
+        names = StringColumn(size)
+        type_index = np.zeros(size, dtype=np.int32)
+        parameters: Dict[int, ParameterColumn] = {}
+
+        i = 0
+        for fam_i, family in enumerate(category.Families):
+            families.append(
+                RevitFamily.model_construct(
+                    Id=family.Id,
+                    Name=family.Name,
+                    Types=[],
+                    Parameters=family.Parameters,
+                )
+            )
+            for type in family.Types:
+                type_i = len(types)
+                types.append(
+                    RevitFamilyType.model_construct(
+                        Id=type.Id,
+                        Name=type.Name,
+                        Instances=[],
+                        Parameters=type.Parameters,
+                    )
+                )
+                type_family.append(fam_i)
+                for element in type.Instances:
+                    ids[i] = element.Id
+                    names.set(i, element.Name)
+                    type_index[i] = type_i
+                    for parameter in element.Parameters:
+                        column = parameters.get(parameter.Id)
+                        if column is None:
+                            column = ParameterColumn(parameter.Definition, size)
+                            parameters[parameter.Id] = column
+                        column.set(i, parameter)
+                    i += 1
+
+        header = RevitCategory.model_construct(
+            **{
+                field: getattr(category, field)
+                for field in RevitCategory.model_fields
+                if field != "Families"
+            },
+            Families=[],
+        )
+        return cls(
+            header,
+            families,
+            types,
+            np.array(type_family, dtype=np.int32),
+            ids,
+            names,
+            type_index,
+            parameters,
+        )
+
+    def to_category(self) -> RevitCategory:
+        """Rebuilds the model tree, instances keep their order within a type"""
+        category = RevitCategory.model_construct(
+            **{
+                field: getattr(self.category, field)
+                for field in RevitCategory.model_fields
+                if field != "Families"
+            },
+            Families=[],
+        )
+        families = [
+            RevitFamily.model_construct(
+                Id=f.Id, Name=f.Name, Types=[], Parameters=list(f.Parameters)
+            )
+            for f in self.families
+        ]
+        types = [
+            RevitFamilyType.model_construct(
+                Id=t.Id, Name=t.Name, Instances=[], Parameters=list(t.Parameters)
+            )
+            for t in self.types
+        ]
+        for type_i, fam_i in enumerate(self.type_family):
+            families[fam_i].Types.append(types[type_i])
+        for family in families:
+            category.add_family(family)
+
+        columns = list(self.parameters.values())
+        for i in range(len(self)):
+            parameters = []
+            for column in columns:
+                parameter = column.parameter_at(i)
+                if parameter is not None:
+                    parameters.append(parameter)
+            types[self.type_index[i]].Instances.append(
+                RevitElement.model_construct(
+                    Id=int(self.ids[i]), Name=self.names[i], Parameters=parameters
+                )
+            )
+        return category
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, parameter: Any) -> Optional[ParameterColumn]:
+        """Parameter column by id or by case-insensitive name"""
+        if isinstance(parameter, int):
+            return self.parameters.get(parameter)
+        return self._by_name.get(str(parameter).casefold())
+
+    def element_ids(self, mask: Optional[np.ndarray] = None) -> List[int]:
+        ids = self.ids if mask is None else self.ids[mask]
+        return ids.tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the columns and their string tables"""
+        return (
+            self.ids.nbytes
+            + self.names.nbytes
+            + self.type_index.nbytes
+            + self.type_family.nbytes
+            + sum(column.nbytes for column in self.parameters.values())
+        )
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
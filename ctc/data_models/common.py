@@ -1,5 +1,7 @@
 """Common data Local Base Model for the CTC API."""
 
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
 from pydantic import BaseModel
 
 # from ctc.api_categories import
@@ -15,6 +17,68 @@ class LocalBaseModel(BaseModel):
                 setattr(self, field, value)
 
 
+class KeyIndex:
+    """Dict index of a model list by (Id, Name), or by another key function,
+    for O(1) lookups. The list stays the source of truth: the index is rebuilt
+    when the list is replaced or its length changes (e.g. a plain append), every
+    hit is checked against the list before it is returned, and a miss is checked
+    against a copy of the list as indexed, so an item replaced in place by one
+    with another key is found"""
+
+    def __init__(self, key: Optional[Callable[[Any], Hashable]] = None):
+        self._key = key or item_key
+        self._items: Optional[List[Any]] = None
+        self._size: int = 0
+        self._positions: Dict[Hashable, int] = {}
+        # The items as indexed, compared in C on a miss
+        self._indexed: List[Any] = []
+
+    def find(self, items: List[Any], key: Hashable) -> int:
+        """Position of the first item with the key, -1 when it is not in the list"""
+        if items is not self._items or len(items) != self._size:
+            self.rebuild(items)
+        i = self._positions.get(key, -1)
+        if i != -1 and self._key(items[i]) != key:
+            # The list was reordered or edited in place
+            self.rebuild(items)
+            i = self._positions.get(key, -1)
+        elif i == -1 and items != self._indexed:
+            # An item was replaced in place
+            self.rebuild(items)
+            i = self._positions.get(key, -1)
+        return i
+
+    def append(self, items: List[Any], item: Any) -> int:
+        """Appends the item to the list and indexes it, returns its position"""
+        items.append(item)
+        return self.appended(items)
+
+    def appended(self, items: List[Any]) -> int:
+        """Indexes the last item of the list, after it was appended through
+        another index of the same list. Returns its position"""
+        if items is not self._items or len(items) != self._size + 1:
+            self.rebuild(items)
+        else:
+            self._positions.setdefault(self._key(items[-1]), len(items) - 1)
+            self._indexed.append(items[-1])
+            self._size = len(items)
+        return len(items) - 1
+
+    def rebuild(self, items: List[Any]) -> None:
+        self._items = items
+        self._size = len(items)
+        self._positions = {}
+        self._indexed = list(items)
+        for i, item in enumerate(items):
+            self._positions.setdefault(self._key(item), i)
+
+
+# Functions
+def item_key(item: Any) -> Hashable:
+    """(Id, Name) identity used by the has_* and get_*_index lookups"""
+    return (item.Id, item.Name)
+
+
 # Prevent running from this file
 if __name__ == "__main__":
     pass
@@ -0,0 +1,68 @@
+"""Element parameter edit data models"""
+
+from enum import Enum
+from typing import Any, List, Optional
+
+from pydantic import computed_field
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class ElementEdit(LocalBaseModel):
+    """A single parameter value to write on an element"""
+
+    ElementId: int
+    ParameterId: int
+    Value: Any
+
+
+class EditStatus(str, Enum):
+    """Outcome of one edit"""
+
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"  # the cached value already matched, nothing was sent
+    SUPERSEDED = "superseded"  # a later edit of the same parameter was sent instead
+    FAILED = "failed"
+
+
+class EditResult(LocalBaseModel):
+    """Outcome of one edit, in the order the edits were given"""
+
+    ElementId: int
+    ParameterId: int
+    Status: EditStatus
+    Error: Optional[str] = None
+
+
+class EditReport(LocalBaseModel):
+    """Per-edit outcomes and throughput of a batch of edits"""
+
+    Results: List[EditResult] = []
+    Requests: int = 0  # element updates sent to Revit
+    Seconds: float = 0.0
+
+    @computed_field
+    @property
+    def Count(self) -> int:
+        return len(self.Results)
+
+    @computed_field
+    @property
+    def Updated(self) -> int:
+        return sum(1 for r in self.Results if r.Status == EditStatus.UPDATED)
+
+    @computed_field
+    @property
+    def Failed(self) -> int:
+        return sum(1 for r in self.Results if r.Status == EditStatus.FAILED)
+
+    @computed_field
+    @property
+    def EditsPerSecond(self) -> float:
+        return round(self.Count / self.Seconds, 1) if self.Seconds else 0.0
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -1,7 +1,7 @@
 """Revit Elements sata models"""
 
 from pydantic import Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 from ctc.data_models.common import LocalBaseModel
@@ -14,6 +14,15 @@ class RevitElement(LocalBaseModel):
     Name: str = Field(alias="name")
     Parameters: Optional[List[Parameter]] = Field(default=[], alias="parameters")
 
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "RevitElement":
+        """Builds an element from a trusted api dict without validation"""
+        return cls.model_construct(
+            Id=data["id"],
+            Name=data["name"],
+            Parameters=[Parameter.from_api(p) for p in data.get("parameters") or ()],
+        )
+
 
 # Prevent running from this file
 if __name__ == "__main__":
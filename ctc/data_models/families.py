@@ -1,8 +1,8 @@
 """Revit Famlies data models"""
 
-from pydantic import Field, computed_field
-from typing import List, Optional
-from ctc.data_models.common import LocalBaseModel
+from pydantic import Field, PrivateAttr, computed_field
+from typing import Hashable, List, Optional
+from ctc.data_models.common import KeyIndex, LocalBaseModel, item_key
 from ctc.data_models.parameters import Parameter
 from ctc.data_models.family_types import RevitFamilyType
 
@@ -15,6 +15,7 @@ class RevitFamily(LocalBaseModel):
     Name: str = Field(alias="name")
     Types: Optional[List[RevitFamilyType]] = Field(default=[], alias="types")
     Parameters: Optional[List[Parameter]] = Field(default=[], alias="parameters")
+    _type_index: KeyIndex = PrivateAttr(default_factory=KeyIndex)
 
     @computed_field
     @property
@@ -33,17 +34,19 @@ class RevitFamily(LocalBaseModel):
 
     # Check to see if the type exists in the family types list
     def has_type(self, type: RevitFamilyType) -> bool:
-        for type_self in self.Types:
-            if (type_self.Id == type.Id) and (type_self.Name == type.Name):
-                return True
-        return False
+        return self.get_type_index(type) != -1
 
     # Get the index of the type in the family types list
     def get_type_index(self, type: RevitFamilyType) -> int:
-        for i, type_self in enumerate(self.Types):
-            if (type_self.Id == type.Id) and (type_self.Name == type.Name):
-                return i
-        return -1
+        return self.find_type(item_key(type))
+
+    # Get the index of the type with the (Id, Name) key
+    def find_type(self, key: Hashable) -> int:
+        return self._type_index.find(self.Types, key)
+
+    # Add the type to the family types list, keeping the index current
+    def add_type(self, type: RevitFamilyType) -> int:
+        return self._type_index.append(self.Types, type)
 
 
 # Prevent running from this file
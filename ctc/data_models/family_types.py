@@ -1,8 +1,8 @@
 """Revit Family Types data models"""
 
-from pydantic import Field, computed_field
+from pydantic import Field, PrivateAttr, computed_field
 from typing import Optional, List
-from ctc.data_models.common import LocalBaseModel
+from ctc.data_models.common import KeyIndex, LocalBaseModel, item_key
 from ctc.data_models.parameters import Parameter
 from ctc.data_models.elements import RevitElement
 
@@ -17,6 +17,7 @@ class RevitFamilyType(LocalBaseModel):
         default=[],
     )
     Parameters: Optional[List[Parameter]] = Field(default=[], alias="parameters")
+    _instance_index: KeyIndex = PrivateAttr(default_factory=KeyIndex)
 
     @computed_field
     @property
@@ -30,17 +31,15 @@ class RevitFamilyType(LocalBaseModel):
 
     # Check to see if the element exists in the family types list
     def has_instance(self, element: RevitElement) -> bool:
-        for element_self in self.Instances:
-            if (element_self.Id == element.Id) and (element_self.Name == element.Name):
-                return True
-        return False
+        return self.get_instance_index(element) != -1
 
     # Get the index of the element in the family types list
     def get_instance_index(self, element: RevitElement) -> int:
-        for i, element_self in enumerate(self.Instances):
-            if (element_self.Id == element.Id) and (element_self.Name == element.Name):
-                return i
-        return -1
+        return self._instance_index.find(self.Instances, item_key(element))
+
+    # Add the element to the instances list, keeping the index current
+    def add_instance(self, element: RevitElement) -> int:
+        return self._instance_index.append(self.Instances, element)
 
 
 # Prevent running from this file
@@ -0,0 +1,20 @@
+"""Name resolution data models"""
+
+from typing import Any
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class NameMatch(LocalBaseModel):
+    """A stored name close to the one asked for, Score is 1.0 for an exact match"""
+
+    Name: str
+    Id: Any
+    Kind: str  # levels, templates, views, categories, sessions or elements
+    Score: float
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
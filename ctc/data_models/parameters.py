@@ -1,52 +1,363 @@
 """Revit Parameters data models"""
 
-from pydantic import Field, computed_field
-from typing import List, Optional
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pydantic import (
+    ConfigDict,
+    Field,
+    GetCoreSchemaHandler,
+    GetJsonSchemaHandler,
+    TypeAdapter,
+    computed_field,
+)
+from pydantic_core import core_schema, to_json
+from typing import Annotated, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from typing_extensions import Required, TypedDict
 from enum import Enum
 from ctc.data_models.common import LocalBaseModel
 
+# Api keys of the Parameter fields
+PARAMETER_ALIASES: Dict[str, str] = {
+    "Id": "id",
+    "Name": "name",
+    "HasValue": "hasValue",
+    "IsShared": "isShared",
+    "IsReadOnly": "isReadOnly",
+    "StorageType": "storageType",
+    "ValueAsString": "valueAsString",
+    "ValueAsElementId": "valueAsElementId",
+    "ValueAsInteger": "valueAsInt",
+    "ValueAsDouble": "valueAsDouble",
+}
+DEFINITION_FIELDS = ("Id", "Name", "IsShared", "IsReadOnly", "StorageType")
+VALUE_FIELDS = (
+    "HasValue",
+    "ValueAsString",
+    "ValueAsElementId",
+    "ValueAsInteger",
+    "ValueAsDouble",
+)
+
+# Interned definitions, one table per project, the least recently used dropped
+MAX_DEFINITION_TABLES = 4
+_tables: (
+    "OrderedDict[str, Dict[Tuple[int, str, bool, bool, str], ParameterDefinition]]"
+) = OrderedDict()
+# Project whose table parameters are interned in, see definition_scope
+_project: ContextVar[str] = ContextVar("parameter_project", default="")
+
+
+class _ParameterFields(TypedDict, total=False):
+    """Typed fields of an api parameter dict, keyed by api key or field name"""
+
+    __pydantic_config__ = ConfigDict(populate_by_name=True)
+
+    Id: Required[Annotated[int, Field(alias="id")]]
+    Name: Required[Annotated[str, Field(alias="name")]]
+    HasValue: Required[Annotated[bool, Field(alias="hasValue")]]
+    IsShared: Required[Annotated[bool, Field(alias="isShared")]]
+    IsReadOnly: Required[Annotated[bool, Field(alias="isReadOnly")]]
+    StorageType: Required[Annotated[str, Field(alias="storageType")]]
+    ValueAsString: Annotated[Optional[str], Field(alias="valueAsString")]
+    ValueAsElementId: Annotated[Optional[int], Field(alias="valueAsElementId")]
+    ValueAsInteger: Annotated[Optional[int], Field(alias="valueAsInt")]
+    ValueAsDouble: Annotated[Optional[float], Field(alias="valueAsDouble")]
+
+
+_fields_adapter = TypeAdapter(_ParameterFields)
+
 
 # Class Definitions
-class Parameter(LocalBaseModel):
-    """Revit Parameter model"""
+class ParameterDefinition:
+    """Part of a parameter shared by every element carrying it. Definitions are
+    interned, get one with ParameterDefinition.intern"""
+
+    __slots__ = DEFINITION_FIELDS
+
+    def __init__(
+        self, Id: int, Name: str, IsShared: bool, IsReadOnly: bool, StorageType: str
+    ):
+        self.Id = Id
+        self.Name = sys.intern(Name)
+        self.IsShared = IsShared
+        self.IsReadOnly = IsReadOnly
+        self.StorageType = sys.intern(StorageType)
+
+    @classmethod
+    def intern(
+        cls, Id: int, Name: str, IsShared: bool, IsReadOnly: bool, StorageType: str
+    ) -> "ParameterDefinition":
+        key = (Id, Name, IsShared, IsReadOnly, StorageType)
+        definitions = definition_table(_project.get())
+        definition = definitions.get(key)
+        if definition is None:
+            definition = definitions.setdefault(key, cls(*key))
+        return definition
+
+    def model_dump(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in DEFINITION_FIELDS}
+
+    def __repr__(self) -> str:
+        return f"ParameterDefinition(Id={self.Id}, Name={self.Name!r})"
+
+
+class Parameter:
+    """Revit Parameter model. Only the value lives on the instance, the id,
+    name, flags and storage type are read through the shared definition.
+    Keeps the API of the pydantic model it replaces: keyword construction by
+    field name or api key, model_validate, model_dump, model_dump_json and
+    model_copy"""
+
+    __slots__ = ("Definition",) + VALUE_FIELDS
+
+    def __init__(
+        self,
+        Definition: Optional[ParameterDefinition] = None,
+        HasValue: bool = False,
+        ValueAsString: Optional[str] = None,
+        ValueAsElementId: Optional[int] = None,
+        ValueAsInteger: Optional[int] = None,
+        ValueAsDouble: Optional[float] = None,
+        **fields: Any,
+    ):
+        if Definition is None:
+            # Built from fields like the pydantic model, validated the same way
+            values = {
+                "HasValue": HasValue,
+                "ValueAsString": ValueAsString,
+                "ValueAsElementId": ValueAsElementId,
+                "ValueAsInteger": ValueAsInteger,
+                "ValueAsDouble": ValueAsDouble,
+            }
+            fields = _fields_adapter.validate_python({**values, **fields})
+            Definition = ParameterDefinition.intern(
+                *(fields[field] for field in DEFINITION_FIELDS)
+            )
+            HasValue, ValueAsString, ValueAsElementId, ValueAsInteger, ValueAsDouble = (
+                fields.get(field) for field in VALUE_FIELDS
+            )
+        elif fields:
+            raise TypeError(f"Unexpected fields with a definition: {', '.join(fields)}")
+        self.Definition = Definition
+        self.HasValue = HasValue
+        self.ValueAsString = ValueAsString
+        self.ValueAsElementId = ValueAsElementId
+        self.ValueAsInteger = ValueAsInteger
+        self.ValueAsDouble = ValueAsDouble
+
+    @property
+    def Id(self) -> int:
+        return self.Definition.Id
+
+    @property
+    def Name(self) -> str:
+        return self.Definition.Name
+
+    @property
+    def IsShared(self) -> bool:
+        return self.Definition.IsShared
+
+    @property
+    def IsReadOnly(self) -> bool:
+        return self.Definition.IsReadOnly
+
+    @property
+    def StorageType(self) -> str:
+        return self.Definition.StorageType
 
-    Id: int = Field(alias="id")
-    Name: str = Field(alias="name")
-    HasValue: bool = Field(
-        alias="hasValue",
-        # exclude=True,
-    )
-    IsShared: bool = Field(
-        alias="isShared",
-        # exclude=True,
-    )
-    IsReadOnly: bool = Field(
-        alias="isReadOnly",
-        # exclude=True,
-    )
-    StorageType: str = Field(
-        alias="storageType",
-        # exclude=True,
-    )
-    ValueAsString: Optional[str] = Field(
-        default=None,
-        alias="valueAsString",
-    )
-    ValueAsElementId: Optional[int] = Field(
-        default=None,
-        alias="valueAsElementId",
-        # exclude=True,
-    )
-    ValueAsInteger: Optional[int] = Field(
-        default=None,
-        alias="valueAsInt",
-        # exclude=True,
-    )
-    ValueAsDouble: Optional[float] = Field(
-        default=None,
-        alias="valueAsDouble",
-        # exclude=True,
-    )
+    @classmethod
+    def model_validate(cls, data: Any) -> "Parameter":
+        """Builds a parameter from an api dict (or one keyed by field names),
+        raises a ValidationError when a field has the wrong type"""
+        if isinstance(data, cls):
+            return data
+        return cls.from_fields(**_fields_adapter.validate_python(data))
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "Parameter":
+        """Builds a parameter from a trusted api dict without validation"""
+        return cls(
+            ParameterDefinition.intern(
+                data["id"],
+                data["name"],
+                data["isShared"],
+                data["isReadOnly"],
+                data["storageType"],
+            ),
+            data["hasValue"],
+            data.get("valueAsString"),
+            data.get("valueAsElementId"),
+            data.get("valueAsInt"),
+            data.get("valueAsDouble"),
+        )
+
+    @classmethod
+    def from_fields(
+        cls,
+        Id: int,
+        Name: str,
+        HasValue: bool,
+        IsShared: bool,
+        IsReadOnly: bool,
+        StorageType: str,
+        ValueAsString: Optional[str] = None,
+        ValueAsElementId: Optional[int] = None,
+        ValueAsInteger: Optional[int] = None,
+        ValueAsDouble: Optional[float] = None,
+    ) -> "Parameter":
+        definition = ParameterDefinition.intern(
+            Id, Name, IsShared, IsReadOnly, StorageType
+        )
+        return cls(
+            definition,
+            bool(HasValue),
+            ValueAsString,
+            ValueAsElementId,
+            ValueAsInteger,
+            ValueAsDouble,
+        )
+
+    def model_dump(
+        self,
+        definitions: Optional[Dict[Any, int]] = None,
+        *,
+        by_alias: bool = False,
+        exclude_none: bool = False,
+    ) -> Dict[str, Any]:
+        """Field name dict of the parameter, api keys with by_alias. With a
+        definitions dict the definition is replaced by its position in it,
+        added when new"""
+        definition = self.Definition
+        if definitions is None:
+            data = {
+                "Id": definition.Id,
+                "Name": definition.Name,
+                "HasValue": self.HasValue,
+                "IsShared": definition.IsShared,
+                "IsReadOnly": definition.IsReadOnly,
+                "StorageType": definition.StorageType,
+                "ValueAsString": self.ValueAsString,
+                "ValueAsElementId": self.ValueAsElementId,
+                "ValueAsInteger": self.ValueAsInteger,
+                "ValueAsDouble": self.ValueAsDouble,
+            }
+            if exclude_none:
+                data = {k: v for k, v in data.items() if v is not None}
+            if by_alias:
+                data = {PARAMETER_ALIASES[k]: v for k, v in data.items()}
+            return data
+        return {
+            "Definition": definitions.setdefault(definition, len(definitions)),
+            "HasValue": self.HasValue,
+            "ValueAsString": self.ValueAsString,
+            "ValueAsElementId": self.ValueAsElementId,
+            "ValueAsInteger": self.ValueAsInteger,
+            "ValueAsDouble": self.ValueAsDouble,
+        }
+
+    def model_dump_json(
+        self, *, by_alias: bool = False, exclude_none: bool = False
+    ) -> str:
+        return to_json(
+            self.model_dump(by_alias=by_alias, exclude_none=exclude_none)
+        ).decode()
+
+    def model_copy(
+        self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False
+    ) -> "Parameter":
+        """Copy of the parameter, the definition is shared either way"""
+        copy = Parameter(
+            self.Definition,
+            self.HasValue,
+            self.ValueAsString,
+            self.ValueAsElementId,
+            self.ValueAsInteger,
+            self.ValueAsDouble,
+        )
+        if update:
+            copy.update(**update)
+        return copy
+
+    def update(self, **kwargs):
+        definition = {}
+        for field, value in kwargs.items():
+            if field in DEFINITION_FIELDS:
+                definition[field] = value
+            elif field in VALUE_FIELDS:
+                setattr(self, field, value)
+        if definition:
+            self.Definition = ParameterDefinition.intern(
+                **{**self.Definition.model_dump(), **definition}
+            )
+
+    @property
+    def Value(self) -> Any:
+        """The value stored in the field matching the storage type"""
+        match self.StorageType:
+            case "Integer":
+                return self.ValueAsInteger
+            case "Double":
+                return self.ValueAsDouble
+            case "ElementId":
+                return self.ValueAsElementId
+            case _:
+                return self.ValueAsString
+
+    # Check to see if a new value equals the stored one
+    def matches_value(self, value: Any) -> bool:
+        current = self.Value
+        if current is None or value is None:
+            return current is None and value is None
+        try:
+            match self.StorageType:
+                case "Integer" | "ElementId":
+                    return int(value) == current
+                case "Double":
+                    return abs(float(value) - current) <= 1e-9
+                case _:
+                    return str(value) == current
+        except (TypeError, ValueError):
+            return False
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Parameter):
+            return NotImplemented
+        return self.Definition is other.Definition and all(
+            getattr(self, f) == getattr(other, f) for f in VALUE_FIELDS
+        )
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Parameter(Id={self.Id}, Name={self.Name!r}, Value={self.Value!r})"
+
+    def _serialize(self, info: Any) -> Dict[str, Any]:
+        context = info.context
+        if isinstance(context, dict) and "definitions" in context:
+            return self.model_dump(context["definitions"])
+        return self.model_dump()
+
+    @classmethod
+    def __get_pydantic_core_schema__(
+        cls, source: Any, handler: GetCoreSchemaHandler
+    ) -> core_schema.CoreSchema:
+        """Lets pydantic models hold parameters, validating with model_validate.
+        Dumping with context={"definitions": {}} writes each definition once"""
+        return core_schema.no_info_plain_validator_function(
+            cls.model_validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                cls._serialize, info_arg=True
+            ),
+        )
+
+    @classmethod
+    def __get_pydantic_json_schema__(
+        cls, schema: core_schema.CoreSchema, handler: GetJsonSchemaHandler
+    ) -> Dict[str, Any]:
+        """Json schema of the api dict a parameter validates from"""
+        return _fields_adapter.json_schema()
 
 
 class StorageLocation(Enum):
@@ -66,6 +377,36 @@ class ParameterSimple(LocalBaseModel):
     # StoredIn: StorageLocation
 
 
+class ParameterCatalog:
+    """Distinct parameters of a category keyed by id and by case-folded name.
+    The first occurrence of an id wins, like a walk of families, then types,
+    then instances. Signature holds the family, type and instance counts the
+    catalog was built for, so changes made behind its back are detected"""
+
+    def __init__(self):
+        self.by_id: Dict[int, ParameterSimple] = {}
+        self.by_name: Dict[str, ParameterSimple] = {}
+        self.signature: Optional[Tuple[int, int, int]] = None
+
+    def add(self, parameters: Iterable[Parameter], stored_in: str) -> None:
+        for parameter in parameters:
+            if parameter.Id in self.by_id:
+                continue
+            simple_parameter = ParameterSimple(
+                Id=parameter.Id, Name=parameter.Name, StoredIn=stored_in
+            )
+            self.by_id[parameter.Id] = simple_parameter
+            self.by_name.setdefault(parameter.Name.casefold(), simple_parameter)
+
+    def clear(self) -> None:
+        self.by_id.clear()
+        self.by_name.clear()
+        self.signature = None
+
+    def values(self) -> List[ParameterSimple]:
+        return list(self.by_id.values())
+
+
 class Parameters(LocalBaseModel):
     """Revit Parameters model"""
 
@@ -77,6 +418,38 @@ class Parameters(LocalBaseModel):
         return len(self.Parameters)
 
 
+# Functions
+def definition_table(
+    project: str = "",
+) -> Dict[Tuple[int, str, bool, bool, str], ParameterDefinition]:
+    """Interned definitions of a project, created on first use"""
+    definitions = _tables.get(project)
+    if definitions is None:
+        definitions = _tables[project] = {}
+        while len(_tables) > MAX_DEFINITION_TABLES:
+            _tables.popitem(last=False)
+    return definitions
+
+
+@contextmanager
+def definition_scope(project: str) -> Iterator[None]:
+    """Parameters validated inside share the definitions of the project"""
+    if project in _tables:
+        _tables.move_to_end(project)
+    token = _project.set(project or "")
+    try:
+        yield
+    finally:
+        _project.reset(token)
+
+
+def dump_definitions(
+    definitions: Dict[ParameterDefinition, int],
+) -> List[Dict[str, Any]]:
+    """The definitions collected by a compact dump, in the order of their positions"""
+    return [definition.model_dump() for definition in definitions]
+
+
 # Prevent running from this file
 if __name__ == "__main__":
     pass
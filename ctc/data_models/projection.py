@@ -0,0 +1,83 @@
+"""Element projection data models, choose which fields of an element are fetched"""
+
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class ProjectionMode(str, Enum):
+    """How much of each element the api returns and the model tree carries"""
+
+    FULL = "full"  # everything, the default
+    IDS = "ids"  # element ids and names only
+    TYPES = "types"  # ids and names of element, type and family, no parameters
+    PARAMETERS = "parameters"  # like full, limited to the named parameters
+
+
+class ElementProjection(LocalBaseModel):
+    """Projection applied to /api/v1/elements requests and responses"""
+
+    Mode: ProjectionMode = ProjectionMode.FULL
+    ParameterNames: Optional[List[str]] = None
+
+    @classmethod
+    def parse(
+        cls, mode: str = "full", parameter_names: Optional[str] = None
+    ) -> "ElementProjection":
+        """Builds a projection from tool arguments, names are comma separated"""
+        names = None
+        if parameter_names:
+            names = [n.strip() for n in parameter_names.split(",") if n.strip()]
+        if names and mode == ProjectionMode.FULL:
+            mode = ProjectionMode.PARAMETERS
+        return cls(Mode=ProjectionMode(mode), ParameterNames=names)
+
+    def query_params(self) -> Dict[str, str]:
+        """include* query parameters understood by the elements endpoint"""
+        if self.Mode == ProjectionMode.IDS:
+            return {
+                "includeParameters": "false",
+                "includeFamily": "false",
+                "includeType": "false",
+            }
+        if self.Mode == ProjectionMode.TYPES:
+            return {
+                "includeParameters": "false",
+                "includeFamily": "true",
+                "includeType": "true",
+            }
+        return {}
+
+    def apply(self, element: Dict[str, Any]) -> Dict[str, Any]:
+        """Trims a raw element before validation, in case the api ignored
+        the include* flags or does not filter parameters by name"""
+        if self.Mode == ProjectionMode.FULL:
+            return element
+        if self.Mode == ProjectionMode.IDS:
+            return {"id": element["id"], "name": element["name"]}
+        if self.Mode == ProjectionMode.TYPES:
+            return _strip_parameters(element, set())
+        return _strip_parameters(
+            element, {n.casefold() for n in self.ParameterNames or []}
+        )
+
+
+# Functions
+def _strip_parameters(node: Dict[str, Any], keep: set) -> Dict[str, Any]:
+    """Copy of an element, type or family dict keeping only the named parameters"""
+    stripped = {"id": node.get("id"), "name": node.get("name")}
+    if keep and node.get("parameters"):
+        stripped["parameters"] = [
+            p for p in node["parameters"] if p.get("name", "").casefold() in keep
+        ]
+    for child in ("type", "family"):
+        if isinstance(node.get(child), dict):
+            stripped[child] = _strip_parameters(node[child], keep)
+    return stripped
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
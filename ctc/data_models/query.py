@@ -0,0 +1,94 @@
+"""Element query data models, filters, grouping and sorting on parameter values"""
+
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from ctc.data_models.common import LocalBaseModel
+
+# Fields every element has besides its parameters
+ELEMENT_FIELDS = ("ElementId", "Name", "Type", "Family")
+ELEMENT_KEYS = {"elementid", "id", "name", "type", "family"}
+
+
+# Class Definitions
+class QueryOp(str, Enum):
+    """Comparison of a filter, strings compare case-insensitively"""
+
+    EQ = "eq"
+    NE = "ne"
+    LT = "lt"
+    LE = "le"
+    GT = "gt"
+    GE = "ge"
+    BETWEEN = "between"  # Value is [low, high], both included
+    IN = "in"  # Value is a list
+    CONTAINS = "contains"  # substring of the value string
+    EXISTS = "exists"  # the element has a value
+    MISSING = "missing"  # the element has no value or no such parameter
+
+
+class QueryAggregate(str, Enum):
+    """Aggregate of each group"""
+
+    COUNT = "count"
+    SUM = "sum"
+    MEAN = "mean"
+    MIN = "min"
+    MAX = "max"
+
+
+class QueryFilter(LocalBaseModel):
+    """A condition on a parameter or element field, Type, Family, Name or ElementId"""
+
+    Parameter: str
+    Op: QueryOp = QueryOp.EQ
+    Value: Any = None
+
+
+class ElementQuery(LocalBaseModel):
+    """Filters combined with and, an optional group by and a sort"""
+
+    Filters: List[QueryFilter] = []
+    GroupBy: Optional[str] = None
+    Aggregate: QueryAggregate = QueryAggregate.COUNT
+    AggregateParameter: Optional[str] = None
+    SortBy: Optional[str] = None
+    Descending: bool = False
+    Columns: List[str] = []  # parameters added to each row
+    Limit: int = 50  # rows or groups returned
+
+    # Parameter names the query reads, besides the element fields
+    def parameter_names(self) -> List[str]:
+        names = [f.Parameter for f in self.Filters] + self.Columns
+        names += [self.GroupBy, self.AggregateParameter, self.SortBy]
+        unique = {}
+        for name in names:
+            if name and name.casefold() not in ELEMENT_KEYS:
+                unique.setdefault(name.casefold(), name)
+        return list(unique.values())
+
+
+class QueryGroup(LocalBaseModel):
+    """One group of a grouped query"""
+
+    Key: Any
+    Count: int
+    Value: Optional[float] = None  # the aggregate, None for count
+
+
+class QueryResult(LocalBaseModel):
+    """Matching rows, or groups when grouped, of a query on one category"""
+
+    CategoryId: str
+    CategoryName: str
+    Elements: int  # elements searched
+    Matched: int
+    Rows: List[Dict[str, Any]] = []
+    Groups: List[QueryGroup] = []
+    Truncated: bool = False  # more rows or groups matched than Limit
+    Seconds: float = 0.0
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
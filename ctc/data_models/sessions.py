@@ -14,6 +14,7 @@ class RevitSession(LocalBaseModel):
     RevitVersion: str
     Port: int
     ActiveProject: Optional[str] = ""
+    Reachable: Optional[bool] = None  # None until the port has been probed
 
 
 class RevitSessions(LocalBaseModel):
@@ -25,7 +26,7 @@ class RevitSessions(LocalBaseModel):
     @computed_field
     @property
     def Count(self) -> int:
-        return len(self.Categories)
+        return len(self.Sessions)
 
 
 # Prevent running from this file
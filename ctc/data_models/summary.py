@@ -0,0 +1,75 @@
+"""Category summary data models, counts and value histograms computed at ingest"""
+
+from typing import Any, List, Optional
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class FamilyCount(LocalBaseModel):
+    """Types and instances of one family"""
+
+    Family: str
+    Types: int
+    Instances: int
+
+
+class TypeCount(LocalBaseModel):
+    """Instances of one type"""
+
+    Family: str
+    Type: str
+    Instances: int
+
+
+class ValueCount(LocalBaseModel):
+    """Elements holding one value"""
+
+    Value: Any
+    Count: int
+
+
+class ParameterSummary(LocalBaseModel):
+    """Value histogram of one instance parameter, Top holds the most common
+    values only, numeric parameters also get their range in internal units"""
+
+    Id: int
+    Name: str
+    StorageType: str
+    Elements: int  # elements carrying the parameter
+    WithValue: int  # elements with a value
+    Distinct: int
+    Top: List[ValueCount] = []
+    Min: Optional[float] = None
+    Max: Optional[float] = None
+    Mean: Optional[float] = None
+
+
+class CategorySummary(LocalBaseModel):
+    """Family, type and parameter aggregates of a category"""
+
+    CategoryId: str
+    CategoryName: str
+    Families: int
+    Types: int
+    Instances: int
+    FamilyCounts: List[FamilyCount] = []
+    TypeCounts: List[TypeCount] = []
+    Parameters: List[ParameterSummary] = []
+
+    # Copy limited to the named parameters (all when None) and top values
+    def select(
+        self, parameter_names: Optional[List[str]] = None, top: int = 5
+    ) -> "CategorySummary":
+        keep = {n.casefold() for n in parameter_names} if parameter_names else None
+        parameters = [
+            p.model_copy(update={"Top": p.Top[:top]})
+            for p in self.Parameters
+            if keep is None or p.Name.casefold() in keep
+        ]
+        return self.model_copy(update={"Parameters": parameters})
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,53 @@
+"""Revit View data models"""
+
+from typing import Any, Dict, List, Optional
+
+from pydantic import computed_field
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class FloorPlanSpec(LocalBaseModel):
+    """A floor plan view to create"""
+
+    Name: str
+    LevelId: int
+    ViewTemplateId: int
+    ScopeBoxId: int = 0
+
+
+class FloorPlanResult(LocalBaseModel):
+    """Outcome of one floor plan spec, in the order the specs were given"""
+
+    Name: str
+    Success: bool = False
+    View: Optional[Dict[str, Any]] = None
+    Error: Optional[str] = None
+
+
+class FloorPlanReport(LocalBaseModel):
+    """Per-view outcomes of a bulk floor plan creation"""
+
+    DryRun: bool = False
+    Results: List[FloorPlanResult] = []
+
+    @computed_field
+    @property
+    def Count(self) -> int:
+        return len(self.Results)
+
+    @computed_field
+    @property
+    def Succeeded(self) -> int:
+        return sum(1 for r in self.Results if r.Success)
+
+    @computed_field
+    @property
+    def Failed(self) -> int:
+        return self.Count - self.Succeeded
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
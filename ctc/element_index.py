@@ -0,0 +1,148 @@
+"""Project-wide reverse index from ElementId to its place in a category tree
+
+Every category tree stored in chat memory is indexed by element id, so a tool
+given an element id finds its category, family, type and instance without
+walking the trees. A tree is re-indexed as a whole when it is stored again,
+e.g. after a refresh; positions are checked on lookup and the tree they point
+into is re-indexed when it changed behind the index's back.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from ctc.data_models.categories import RevitCategory
+from ctc.data_models.elements import RevitElement
+
+
+# Class Definitions
+class ElementLocation(NamedTuple):
+    """Where an element sits in a stored category tree"""
+
+    Key: str  # chat memory key of the tree
+    CategoryId: str
+    Family: int
+    Type: int
+    Instance: int
+
+
+class ElementIndex:
+    """ElementId -> ElementLocation over the stored category trees. An element
+    in several trees (e.g. fetched with two projections) points into the tree
+    stored last"""
+
+    def __init__(self):
+        # tree key -> the category tree indexed
+        self._trees: Dict[str, RevitCategory] = {}
+        # tree key -> element id -> (family, type, instance) positions
+        self._positions: Dict[str, Dict[int, Tuple[int, int, int]]] = {}
+        # element id -> key of the tree it is looked up in
+        self._owners: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def __contains__(self, element_id: object) -> bool:
+        return _element_id(element_id) in self._owners
+
+    def replace(self, key: str, category: RevitCategory) -> None:
+        """Indexes the tree stored under key instead of its previous version,
+        costing one pass over this tree only"""
+        positions = {}
+        for fam_i, family in enumerate(category.Families):
+            for type_i, type in enumerate(family.Types):
+                for elem_i, element in enumerate(type.Instances):
+                    positions.setdefault(element.Id, (fam_i, type_i, elem_i))
+        previous = self._positions.get(key, {})
+        self._trees[key] = category
+        self._positions[key] = positions
+        self._owners.update(dict.fromkeys(positions, key))
+        self._release(key, previous.keys() - positions.keys())
+
+    def remove(self, key: str) -> None:
+        """Drops the tree stored under key from the index"""
+        self._trees.pop(key, None)
+        self._release(key, self._positions.pop(key, {}).keys())
+
+    def locate(self, element_id: object) -> Optional[ElementLocation]:
+        """Location of an element, None when no stored tree holds it"""
+        found = self._find(_element_id(element_id))
+        return None if found is None else found[0]
+
+    def element(self, element_id: object) -> Optional[RevitElement]:
+        """The element model in its stored tree, None when not held"""
+        found = self._find(_element_id(element_id))
+        return None if found is None else found[1]
+
+    def category(self, element_id: object) -> Optional[RevitCategory]:
+        """The stored category tree holding an element"""
+        location = self.locate(element_id)
+        return None if location is None else self._trees[location.Key]
+
+    def copies(self, element_id: object) -> List[Tuple[str, RevitElement]]:
+        """The element in every stored tree holding it, with the tree key,
+        e.g. to write a new value into each copy"""
+        element_id = _element_id(element_id)
+        keys = [
+            key for key, positions in self._positions.items() if element_id in positions
+        ]
+        copies = []
+        for key in keys:
+            found = self._at(key, element_id)
+            if found is not None:
+                copies.append((key, found[1]))
+        return copies
+
+    def _release(self, key: str, element_ids: Iterable[int]) -> None:
+        """Drops the elements no longer in the tree under key, those also in
+        another tree point there instead"""
+        orphans = [i for i in element_ids if self._owners.get(i) == key]
+        for element_id in orphans:
+            del self._owners[element_id]
+        for other, positions in self._positions.items():
+            for element_id in orphans:
+                if element_id in positions:
+                    self._owners.setdefault(element_id, other)
+
+    def _find(
+        self, element_id: Optional[int]
+    ) -> Optional[Tuple[ElementLocation, RevitElement]]:
+        """Location and element in the tree the element is looked up in"""
+        key = self._owners.get(element_id)
+        if key is None:
+            return None
+        return self._at(key, element_id)
+
+    def _at(
+        self, key: str, element_id: Optional[int], retry: bool = True
+    ) -> Optional[Tuple[ElementLocation, RevitElement]]:
+        """Location and element in the tree under key, re-indexing the tree
+        once when the stored position no longer holds the element"""
+        position = self._positions.get(key, {}).get(element_id)
+        if position is None:
+            return None
+        category = self._trees[key]
+        fam_i, type_i, elem_i = position
+        try:
+            element = category.Families[fam_i].Types[type_i].Instances[elem_i]
+        except IndexError:
+            element = None
+        if element is None or element.Id != element_id:
+            if not retry:
+                return None
+            self.replace(key, category)
+            return self._at(key, element_id, retry=False)
+        location = ElementLocation(key, category.Id, fam_i, type_i, elem_i)
+        return location, element
+
+
+# Functions
+def _element_id(element_id: object) -> Optional[int]:
+    """Element ids arrive as ints or, from tool calls, as strings"""
+    try:
+        return int(element_id)
+    except (TypeError, ValueError):
+        return None
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,141 @@
+"""TTL response cache for CTC GET endpoints with stale-while-revalidate and LRU eviction
+
+Entries are keyed by (port, active project, path, params). Only paths listed in
+ENDPOINT_TTLS are cached. An entry older than its TTL but younger than
+TTL + STALE_FOR is still served while the client refreshes it in the background,
+except for the paths in NO_STALE_PATHS.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Seconds a response stays fresh, per api path
+ENDPOINT_TTLS: Dict[str, float] = {
+    "/api/v1/projects/active": 30.0,
+    "/api/v1/levels": 300.0,
+    "/api/v1/views": 60.0,
+    "/api/v1/views/templates": 300.0,
+    "/api/v1/worksets": 300.0,
+    "/api/v1/families": 120.0,
+}
+
+# Seconds past the TTL a stale response may be served while revalidating
+STALE_FOR: float = 300.0
+
+# The active project path is not keyed on the project it reports
+ACTIVE_PROJECT_PATH = "/api/v1/projects/active"
+
+# Paths never served stale, a dead port must not look alive past the TTL
+NO_STALE_PATHS = {ACTIVE_PROJECT_PATH}
+
+FRESH = "fresh"
+STALE = "stale"
+
+
+# Class Definitions
+class ResponseCache:
+    """Thread safe LRU of parsed responses with per-endpoint TTLs"""
+
+    def __init__(self, max_entries: int = 256, stale_for: float = STALE_FOR):
+        self.max_entries = max_entries
+        self.stale_for = stale_for
+        self.ttls: Dict[str, float] = dict(ENDPOINT_TTLS)
+        self._lock = threading.Lock()
+        # key -> (stored_at, ttl, value), oldest use first
+        self._entries: "OrderedDict[Hashable, Tuple[float, float, Any]]" = OrderedDict()
+        self._projects: Dict[int, str] = {}
+        self.hits: int = 0
+        self.stale_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def ttl_for(self, path: str) -> Optional[float]:
+        """TTL of an api path, None when the path is not cached"""
+        return self.ttls.get(path)
+
+    def set_project(self, port: int, project: str) -> None:
+        """Records the active project of a port, later keys include it"""
+        with self._lock:
+            self._projects[int(port)] = project or ""
+
+    def project(self, port: int) -> str:
+        """Active project last recorded for a port, empty when unknown"""
+        return self._projects.get(int(port), "")
+
+    def key(self, port: int, path: str, params: Hashable) -> Hashable:
+        project = "" if path == ACTIVE_PROJECT_PATH else self._projects.get(port, "")
+        return (int(port), project, path, params)
+
+    def lookup(self, key: Hashable) -> Tuple[Any, Optional[str]]:
+        """Returns (value, FRESH | STALE) or (None, None) on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, ttl, value = entry
+                age = now - stored_at
+                if age <= ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value, FRESH
+                if age <= ttl + self.stale_for and key[2] not in NO_STALE_PATHS:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    return value, STALE
+                del self._entries[key]
+            self.misses += 1
+            return None, None
+
+    def store(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(
+        self, port: Optional[int] = None, *paths: str, prefix: bool = False
+    ) -> int:
+        """Drops the entries of a port (all ports with None) for the given paths,
+        or for every path starting with them when prefix is set. No paths drops
+        everything for the port. Returns the number of entries removed"""
+        with self._lock:
+            removed = [
+                key
+                for key in self._entries
+                if (port is None or key[0] == int(port))
+                and (
+                    not paths
+                    or any(
+                        key[2].startswith(p) if prefix else key[2] == p for p in paths
+                    )
+                )
+            ]
+            for key in removed:
+                del self._entries[key]
+        return len(removed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for tuning the TTLs"""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache()
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,89 @@
+"""Runtime settings for the CTC API, loaded once from the .env file"""
+
+import os
+import random
+from typing import Optional
+
+from dotenv import load_dotenv, find_dotenv, set_key
+
+from ctc.data_models.common import LocalBaseModel
+
+
+# Class Definitions
+class CTCSettings(LocalBaseModel):
+    """CTC API key, target Revit port and ingestion options"""
+
+    ApiKey: str = ""
+    RevitPort: int = 0
+    DotenvPath: str = ""
+    # Build element models without validation, the add-in is our own
+    TrustedIngest: bool = False
+    # Fraction of elements still fully validated in trusted mode
+    ValidateSample: float = 0.01
+    # Validate everything, overrides TrustedIngest
+    StrictValidation: bool = False
+    # Snapshot folder answering element queries instead of the live project
+    SnapshotPath: str = ""
+
+    @classmethod
+    def from_env(cls, dotenv_path: str = "") -> "CTCSettings":
+        """Reads the .env file (values in the file win) and the environment"""
+        dotenv_path = dotenv_path or find_dotenv(usecwd=True)
+        if dotenv_path:
+            load_dotenv(dotenv_path, override=True)
+        port = os.getenv("REVIT_PORT", "")
+        return cls(
+            ApiKey=os.getenv("CTC_API_KEY", ""),
+            RevitPort=int(port) if port.isdigit() else 0,
+            DotenvPath=dotenv_path,
+            TrustedIngest=_env_flag("CTC_TRUSTED_INGEST"),
+            ValidateSample=float(os.getenv("CTC_VALIDATE_SAMPLE", "0.01")),
+            StrictValidation=_env_flag("CTC_STRICT_VALIDATION"),
+            SnapshotPath=os.getenv("CTC_SNAPSHOT_PATH", ""),
+        )
+
+    def trust_element(self) -> bool:
+        """Whether the next element may skip validation. Decided per element so
+        a sampled fraction is still validated in trusted mode"""
+        if self.StrictValidation or not self.TrustedIngest:
+            return False
+        return random.random() >= self.ValidateSample
+
+
+_settings: Optional[CTCSettings] = None
+
+
+# Functions
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def get_settings() -> CTCSettings:
+    """Returns the cached settings, the .env file is only read on first use"""
+    global _settings
+    if _settings is None:
+        _settings = CTCSettings.from_env()
+    return _settings
+
+
+def reload_settings() -> CTCSettings:
+    """Re-reads the .env file, e.g. after it was edited outside the app"""
+    global _settings
+    _settings = CTCSettings.from_env()
+    return _settings
+
+
+def set_revit_port(port: int, persist: bool = True) -> CTCSettings:
+    """Points the cached settings at another Revit port.
+    With persist the port is also written to the .env file for the next start."""
+    settings = get_settings()
+    settings.update(RevitPort=int(port))
+    os.environ["REVIT_PORT"] = str(port)
+    if persist and settings.DotenvPath:
+        set_key(settings.DotenvPath, "REVIT_PORT", str(port))
+    return settings
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
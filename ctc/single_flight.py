@@ -0,0 +1,108 @@
+"""Single-flight coalescing of identical in-flight requests
+
+Concurrent calls with the same key share one execution and its result. The
+in-flight table is guarded by a thread lock and results are handed over with
+concurrent futures, so callers on different event loops (one per Streamlit
+session thread) are coalesced as well.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+# Class Definitions
+class SingleFlight:
+    """Runs one call per key at a time, later callers wait for its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.calls: int = 0
+        self.deduplicated: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        """Counters for tuning, deduplicated calls never reached the server"""
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": self.in_flight,
+        }
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits call() unless the same key is already running, then shares it.
+        When the running call is cancelled its followers are not: one of them
+        runs call() again and the others wait for it"""
+        counted = False
+        while True:
+            with self._lock:
+                if not counted:
+                    self.calls += 1
+                future = self._in_flight.get(key)
+                leader = future is None
+                if leader:
+                    future = Future()
+                    self._in_flight[key] = future
+                elif not counted:
+                    self.deduplicated += 1
+                counted = True
+
+            if not leader:
+                try:
+                    return await _wait(future)
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = await call()
+            except asyncio.CancelledError:
+                self._release(key, future)
+                future.set_exception(_LeaderCancelled())
+                raise
+            except BaseException as e:
+                self._release(key, future)
+                future.set_exception(e)
+                raise
+            self._release(key, future)
+            future.set_result(result)
+            return result
+
+    def _release(self, key: Hashable, future: Future) -> None:
+        """Ends the flight of a key before its result is handed over, so a
+        follower retrying after a cancellation starts a new one"""
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+
+class _LeaderCancelled(Exception):
+    """Handed to the followers of a cancelled call, they retry it"""
+
+
+# Functions
+def _wait(future: Future) -> asyncio.Future:
+    """Waits on a concurrent future from any loop. Unlike asyncio.wrap_future,
+    cancelling one waiter does not cancel the shared future for the others"""
+    loop = asyncio.get_running_loop()
+    waiter = loop.create_future()
+
+    def copy_result(done: Future) -> None:
+        if waiter.done():
+            return
+        if done.exception() is not None:
+            waiter.set_exception(done.exception())
+        else:
+            waiter.set_result(done.result())
+
+    future.add_done_callback(lambda done: loop.call_soon_threadsafe(copy_result, done))
+    return waiter
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
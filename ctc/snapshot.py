@@ -0,0 +1,332 @@
+"""Binary project snapshots, one Arrow IPC file per category and a json manifest
+
+A snapshot folder holds manifest.json and <category id>.arrow files. Each
+category file is one record batch of its instances: ElementId, Name, Type and
+per instance parameter a typed value column, a dictionary encoded
+ValueAsString column and a flags column. Families, types and parameter
+definitions are few and travel as json in the schema metadata, next to the
+category summary computed when writing.
+
+Snapshot reads only the manifest; a category file is memory-mapped the first
+time it is asked for, so opening one category does not parse the others.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+from ctc.data_models.categories import RevitCategories, RevitCategory
+from ctc.data_models.columnar import ElementColumns, ParameterColumn, StringColumn
+from ctc.data_models.families import RevitFamily
+from ctc.data_models.family_types import RevitFamilyType
+from ctc.data_models.parameters import (
+    Parameter,
+    ParameterDefinition,
+    definition_scope,
+    dump_definitions,
+)
+from ctc.data_models.summary import CategorySummary
+from ctc.summary import summarize
+
+SNAPSHOT_FORMAT = "ctc-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+JSON_FILE = "snapshot.json"
+HEADER_KEY = b"ctc.header"
+SUMMARY_KEY = b"ctc.summary"
+
+# Bits of a parameter flags column
+PRESENT = 1
+HAS_VALUE = 2
+NULL = 4
+
+# Arrow type of the typed value column, per parameter storage type
+VALUE_TYPES: Dict[str, pa.DataType] = {
+    "Integer": pa.int64(),
+    "Double": pa.float64(),
+    "ElementId": pa.int64(),
+}
+
+# Open snapshots by folder, with the manifest mtime they were opened at
+_snapshots: Dict[str, Tuple[float, "Snapshot"]] = {}
+
+
+# Class Definitions
+class Snapshot:
+    """Lazy reader of a snapshot folder. Categories are looked up by id,
+    display name or enum name"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), "r") as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get("Format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} folder")
+        if self.manifest.get("Version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Snapshot version {self.manifest['Version']} is newer than "
+                f"{SNAPSHOT_VERSION}"
+            )
+        self.entries: List[Dict[str, Any]] = self.manifest["Categories"]
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        for entry in self.entries:
+            self._keys.setdefault(str(entry["Id"]), entry)
+            self._keys.setdefault(entry["Name"].casefold(), entry)
+            if entry.get("EnumName"):
+                self._keys.setdefault(entry["EnumName"].casefold(), entry)
+        self._batches: Dict[str, pa.RecordBatch] = {}
+        self._columns: Dict[str, ElementColumns] = {}
+
+    @property
+    def Count(self) -> int:
+        return len(self.entries)
+
+    # Manifest entry of a category, None when the snapshot does not hold it
+    def entry(self, category: Any) -> Optional[Dict[str, Any]]:
+        return self._keys.get(str(category).casefold())
+
+    # Memory-mapped record batch of a category, opened once
+    def batch(self, category: Any) -> pa.RecordBatch:
+        entry = self.entry(category)
+        if entry is None:
+            raise KeyError(f"Category {category} is not in the snapshot")
+        batch = self._batches.get(entry["Id"])
+        if batch is None:
+            source = pa.memory_map(os.path.join(self.path, entry["File"]), "r")
+            batch = pa.ipc.open_file(source).get_batch(0)
+            self._batches[entry["Id"]] = batch
+        return batch
+
+    def columns(self, category: Any) -> ElementColumns:
+        """Columnar store of a category, numeric columns map the file"""
+        batch = self.batch(category)
+        id = self.entry(category)["Id"]
+        columns = self._columns.get(id)
+        if columns is None:
+            with definition_scope(self.manifest.get("Project", "")):
+                columns = read_columns(batch)
+            self._columns[id] = columns
+        return columns
+
+    def summary(self, category: Any) -> CategorySummary:
+        """Aggregates of a category, stored with it when the snapshot was written"""
+        metadata = self.batch(category).schema.metadata
+        if SUMMARY_KEY in metadata:
+            return CategorySummary.model_validate_json(metadata[SUMMARY_KEY])
+        return summarize(self.columns(category))
+
+    def category(self, category: Any) -> RevitCategory:
+        """Model tree of a category"""
+        return self.columns(category).to_category()
+
+    def load(self) -> RevitCategories:
+        """Model tree of every category"""
+        project = RevitCategories()
+        for entry in self.entries:
+            project.add_category(self.category(entry["Id"]))
+        return project
+
+
+# Functions
+def open_snapshot(path: str) -> Snapshot:
+    """Snapshot of the folder, kept open (with its mapped categories) until
+    the folder is written again"""
+    mtime = os.path.getmtime(os.path.join(path, MANIFEST_FILE))
+    cached = _snapshots.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, Snapshot(path))
+        _snapshots[path] = cached
+    return cached[1]
+
+
+def write_snapshot(
+    project: RevitCategories,
+    path: str,
+    *,
+    name: str = "",
+    json_export: bool = False,
+) -> Dict[str, Any]:
+    """Writes the project to the path folder and returns the manifest.
+    json_export also writes the single json file of RevitCategories.snapshot"""
+    os.makedirs(path, exist_ok=True)
+    entries = []
+    for category in project.Categories:
+        file_name = f"{category.Id}.arrow"
+        columns = ElementColumns.from_category(category)
+        batch = write_columns(columns)
+        with pa.OSFile(os.path.join(path, file_name), "wb") as sink:
+            with pa.ipc.new_file(sink, batch.schema) as writer:
+                writer.write_batch(batch)
+        entries.append(
+            {
+                "Id": category.Id,
+                "Name": category.Name,
+                "EnumName": category.EnumName,
+                "File": file_name,
+                "Elements": len(columns),
+                "Families": len(columns.families),
+                "Bytes": os.path.getsize(os.path.join(path, file_name)),
+            }
+        )
+    manifest = {
+        "Format": SNAPSHOT_FORMAT,
+        "Version": SNAPSHOT_VERSION,
+        "Project": name,
+        "Created": datetime.now().isoformat(timespec="seconds"),
+        "Categories": entries,
+    }
+    # The manifest goes last, a folder without one is an unfinished write
+    with open(os.path.join(path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=4)
+    if json_export:
+        with open(os.path.join(path, JSON_FILE), "w") as f:
+            json.dump(project.snapshot(), f, indent=4)
+    return manifest
+
+
+def write_columns(columns: ElementColumns) -> pa.RecordBatch:
+    """Record batch of a columnar category, the tree parts go in the metadata"""
+    definitions = {}
+    header = {
+        "Category": {
+            field: getattr(columns.category, field)
+            for field in RevitCategory.model_fields
+            if field != "Families"
+        },
+        "Families": [
+            {
+                "Id": f.Id,
+                "Name": f.Name,
+                "Parameters": [p.model_dump(definitions) for p in f.Parameters],
+            }
+            for f in columns.families
+        ],
+        "Types": [
+            {
+                "Id": t.Id,
+                "Name": t.Name,
+                "Parameters": [p.model_dump(definitions) for p in t.Parameters],
+            }
+            for t in columns.types
+        ],
+        "TypeFamily": columns.type_family.tolist(),
+        "Columns": [],
+    }
+    arrays = [
+        pa.array(columns.ids, type=pa.int64()),
+        _dictionary(columns.names),
+        pa.array(columns.type_index, type=pa.int32()),
+    ]
+    names = ["ElementId", "Name", "Type"]
+    for column in columns.parameters.values():
+        header["Columns"].append(
+            definitions.setdefault(column.Definition, len(definitions))
+        )
+        prefix = str(column.Id)
+        if column.values is not None:
+            arrays.append(pa.array(column.values, type=VALUE_TYPES[column.StorageType]))
+            names.append(prefix)
+        flags = (
+            column.present.astype(np.uint8) * PRESENT
+            | column.has_value.astype(np.uint8) * HAS_VALUE
+            | column.null.astype(np.uint8) * NULL
+        )
+        arrays.extend([_dictionary(column.strings), pa.array(flags)])
+        names.extend([f"{prefix}#s", f"{prefix}#f"])
+    header["Definitions"] = dump_definitions(definitions)
+    schema = pa.schema(
+        [pa.field(n, a.type) for n, a in zip(names, arrays)],
+        metadata={
+            HEADER_KEY: json.dumps(header),
+            SUMMARY_KEY: summarize(columns).model_dump_json(),
+        },
+    )
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def read_columns(batch: pa.RecordBatch) -> ElementColumns:
+    """Columnar category of a record batch written by write_columns"""
+    header = json.loads(batch.schema.metadata[HEADER_KEY])
+    definitions = [ParameterDefinition.intern(**d) for d in header["Definitions"]]
+
+    def parameters(dumps: List[Dict[str, Any]]) -> List[Parameter]:
+        return [
+            Parameter(
+                definitions[p["Definition"]],
+                p["HasValue"],
+                p["ValueAsString"],
+                p["ValueAsElementId"],
+                p["ValueAsInteger"],
+                p["ValueAsDouble"],
+            )
+            for p in dumps
+        ]
+
+    category = RevitCategory.model_construct(**header["Category"], Families=[])
+    families = [
+        RevitFamily.model_construct(
+            Id=f["Id"], Name=f["Name"], Types=[], Parameters=parameters(f["Parameters"])
+        )
+        for f in header["Families"]
+    ]
+    types = [
+        RevitFamilyType.model_construct(
+            Id=t["Id"],
+            Name=t["Name"],
+            Instances=[],
+            Parameters=parameters(t["Parameters"]),
+        )
+        for t in header["Types"]
+    ]
+    columns = {}
+    for position in header["Columns"]:
+        definition = definitions[position]
+        prefix = str(definition.Id)
+        values = None
+        if prefix in batch.schema.names:
+            values = batch.column(prefix).to_numpy()
+        flags = batch.column(f"{prefix}#f").to_numpy()
+        columns[definition.Id] = ParameterColumn.from_arrays(
+            definition,
+            (flags & PRESENT).astype(bool),
+            (flags & HAS_VALUE).astype(bool),
+            (flags & NULL).astype(bool),
+            values,
+            _strings(batch.column(f"{prefix}#s")),
+        )
+    return ElementColumns(
+        category,
+        families,
+        types,
+        np.array(header["TypeFamily"], dtype=np.int32),
+        batch.column("ElementId").to_numpy(),
+        _strings(batch.column("Name")),
+        batch.column("Type").to_numpy(),
+        columns,
+    )
+
+
+def _dictionary(strings: StringColumn) -> pa.DictionaryArray:
+    """Dictionary array of a string column, code -1 becomes null"""
+    codes = pa.array(strings.codes, type=pa.int32(), mask=strings.codes == -1)
+    return pa.DictionaryArray.from_arrays(codes, pa.array(strings.table, pa.string()))
+
+
+def _strings(array: pa.DictionaryArray) -> StringColumn:
+    indices = array.indices
+    if indices.null_count:
+        # Nulls come back as nan in a float copy
+        codes = np.nan_to_num(indices.to_numpy(zero_copy_only=False), nan=-1)
+        codes = codes.astype(np.int32)
+    else:
+        codes = indices.to_numpy()
+    return StringColumn.from_codes(codes, array.dictionary.to_pylist())
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,104 @@
+"""Category aggregates computed once from ElementColumns
+
+Instance counts per family and type and a value histogram per instance
+parameter, small enough to hand to the model instead of the category tree.
+"""
+
+from typing import List
+
+import numpy as np
+
+from ctc.data_models.columnar import ElementColumns, ParameterColumn
+from ctc.data_models.summary import (
+    CategorySummary,
+    FamilyCount,
+    ParameterSummary,
+    TypeCount,
+    ValueCount,
+)
+
+# Most common values kept per parameter histogram
+HISTOGRAM_SIZE = 20
+
+
+# Functions
+def summarize(columns: ElementColumns, top: int = HISTOGRAM_SIZE) -> CategorySummary:
+    """Aggregates of a columnar category"""
+    type_counts = np.bincount(columns.type_index, minlength=len(columns.types))
+    family_types = np.bincount(columns.type_family, minlength=len(columns.families))
+    family_instances = np.bincount(
+        columns.type_family, weights=type_counts, minlength=len(columns.families)
+    )
+    return CategorySummary(
+        CategoryId=columns.category.Id,
+        CategoryName=columns.category.Name,
+        Families=len(columns.families),
+        Types=len(columns.types),
+        Instances=len(columns),
+        FamilyCounts=sorted(
+            (
+                FamilyCount(Family=f.Name, Types=int(n), Instances=int(i))
+                for f, n, i in zip(columns.families, family_types, family_instances)
+            ),
+            key=lambda c: c.Instances,
+            reverse=True,
+        ),
+        TypeCounts=sorted(
+            (
+                TypeCount(
+                    Family=columns.families[fam_i].Name,
+                    Type=t.Name,
+                    Instances=int(n),
+                )
+                for t, fam_i, n in zip(columns.types, columns.type_family, type_counts)
+            ),
+            key=lambda c: c.Instances,
+            reverse=True,
+        ),
+        Parameters=[
+            summarize_parameter(column, top) for column in columns.parameters.values()
+        ],
+    )
+
+
+def summarize_parameter(column: ParameterColumn, top: int) -> ParameterSummary:
+    """Histogram of a parameter column, by value string when there is one"""
+    summary = ParameterSummary(
+        Id=column.Id,
+        Name=column.Name,
+        StorageType=column.StorageType,
+        Elements=int(column.present.sum()),
+        WithValue=int((~column.null).sum()),
+        Distinct=0,
+    )
+    codes = column.strings.codes
+    has_string = codes != -1
+    if has_string.any():
+        counts = np.bincount(codes[has_string], minlength=len(column.strings.table))
+        summary.Distinct = int(np.count_nonzero(counts))
+        summary.Top = _top(column.strings.table, counts, top)
+    elif column.values is not None and summary.WithValue:
+        values, counts = np.unique(column.values[~column.null], return_counts=True)
+        summary.Distinct = len(values)
+        summary.Top = _top(values.tolist(), counts, top)
+    if column.values is not None and summary.WithValue:
+        values = column.values[~column.null]
+        summary.Min = float(values.min())
+        summary.Max = float(values.max())
+        summary.Mean = float(values.mean())
+    return summary
+
+
+def _top(values: List, counts: np.ndarray, top: int) -> List[ValueCount]:
+    """The most common values, ties in order of appearance"""
+    order = np.argsort(-counts, kind="stable")[:top]
+    return [
+        ValueCount(Value=values[i], Count=int(counts[i]))
+        for i in order.tolist()
+        if counts[i]
+    ]
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
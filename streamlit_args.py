@@ -1,6 +1,5 @@
 """Streamlit app for the Revit Project Assistant."""
 
-import asyncio
 import logging
 import json
 import streamlit as st
@@ -18,6 +17,7 @@ from core.openai_functions import (
     ChatCompletion,
 )
 from core.main_entry import main
+from ctc.client import run_sync
 
 
 # Set up logging
@@ -115,7 +115,7 @@ if "processing" not in st.session_state:
 # Initialize backend components
 if "openai_client" not in st.session_state or "tool_manager" not in st.session_state:
     logging.info("Initiate Backend...")
-    backend = asyncio.run(main(initialize_only=True))
+    backend = run_sync(main(initialize_only=True))
     st.session_state.openai_client = backend["openai_client"]
     st.session_state.tool_manager = backend["tool_manager"]
 
@@ -254,12 +254,21 @@ if st.session_state.processing and st.session_state.messages:
                 system_message = """You are a BIM Automation Assistant that helps users with Revit tasks.
 You can understand natural language requests and convert them into appropriate actions.
 When users mention names of levels, templates, or views, you can look up their IDs automatically.
+When a name does not match exactly, use resolve_name to get the closest IDs.
 
 When asked to create a floor plan:
 1. Use the create_floor_plan function directly
 2. Convert names to IDs using the stored mappings
 3. Do not check prerequisites - assume they are met
 4. For no scope box, use ScopeBoxId = 0
+5. For several floor plans at once use create_floor_plans with one spec per view
+
+When asked which or how many elements match parameter values, use query_elements
+with filters rather than get_elements, it returns only the matching rows or groups.
+For counts per family or type and common parameter values use get_category_summary.
+
+Large tool results come back one page at a time, with a Cursor and the number of
+Pages. Call fetch_more with the Cursor and the next Page only when the rest is needed.
 
 Focus on understanding user intent and executing requested actions efficiently."""
                 logging.info(f"System message: {system_message}")
@@ -274,7 +283,7 @@ Focus on understanding user intent and executing requested actions efficiently."
 
                 # Get initial response
                 logging.info("Sending request to OpenAI")
-                initial_response = asyncio.run(
+                initial_response = run_sync(
                     st.session_state.openai_client.create_chat_completion(request)
                 )
                 logging.info(f"Received initial response: {initial_response}")
@@ -293,7 +302,7 @@ Focus on understanding user intent and executing requested actions efficiently."
                         logging.info(
                             f"Executing tool: {tool_call.name} with parameters: {tool_call.parameters}"
                         )
-                        tool_response = asyncio.run(
+                        tool_response = run_sync(
                             st.session_state.tool_manager.execute_tool(tool_call)
                         )
                         logging.info(f"Tool response: {tool_response}")
@@ -319,7 +328,7 @@ Focus on understanding user intent and executing requested actions efficiently."
 
                         # Get LLM's interpretation of the tool response
                         logging.info("Getting final response from OpenAI")
-                        last_response = asyncio.run(
+                        last_response = run_sync(
                             st.session_state.openai_client.create_chat_completion(
                                 follow_up_request
                             )
@@ -405,7 +414,7 @@ if st.session_state.suggested_actions:
 
                             if level_id and template_id:
                                 # Create the floor plan
-                                result = asyncio.run(
+                                result = run_sync(
                                     st.session_state.tool_manager.execute_tool(
                                         ToolCall(
                                             name="create_floor_plan",
@@ -424,7 +433,7 @@ if st.session_state.suggested_actions:
                                         f"Successfully created view: {values['name']}"
                                     )
                                     # Force refresh of views in sidebar
-                                    asyncio.run(
+                                    run_sync(
                                         st.session_state.tool_manager.execute_tool(
                                             ToolCall(name="getViews", parameters={})
                                         )
@@ -447,7 +456,7 @@ if st.session_state.suggested_actions:
                     if st.form_submit_button("Execute"):
                         with st.spinner("Setting active session..."):
                             # Set the active session in the .env file
-                            result = asyncio.run(
+                            result = run_sync(
                                 st.session_state.set_active_session(
                                     Port=values["port"],
                                     ActiveProject=values["revit project"],
@@ -459,7 +468,7 @@ if st.session_state.suggested_actions:
                                     f"Successfully set active session to port: {values['port']}"
                                 )
                                 # Force refresh of sessions in sidebar
-                                asyncio.run(
+                                run_sync(
                                     st.session_state.tool_manager.execute_tool(
                                         ToolCall(
                                             name="get_active_session", parameters={}
@@ -0,0 +1,77 @@
+"""Incremental parsing of a top level json array from a stream of byte chunks."""
+
+import codecs
+import json
+from typing import Any, AsyncIterator
+
+_WHITESPACE = " \t\n\r"
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    """Yields the items of a json array as soon as each one is complete.
+    Only the unparsed tail of the body is kept in memory, so peak memory
+    follows the chunk and item size rather than the size of the whole array.
+
+    An item cut by a chunk is parsed again only once the buffered part of it
+    has doubled, so an item spanning many chunks costs a few parses rather
+    than one per chunk (which made large items quadratic)."""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    # Buffer length to reach before parsing the cut item again
+    retry_at = 0
+    started = False
+    finished = False
+    stream = chunks.__aiter__()
+
+    while True:
+        # Skip separators between items
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE + ",":
+            if buffer[pos] == "," and not started:
+                raise ValueError("Expected a json array")
+            pos += 1
+
+        if pos < len(buffer) and (len(buffer) >= retry_at or finished):
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a json array")
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if finished:
+                    raise
+                end = -1
+            # A number is complete only once a separator follows it, the
+            # chunk may end after "-3" or "-3." of "-3.5"
+            if end != -1 and (
+                finished or end < len(buffer) and buffer[end] in _WHITESPACE + ",]"
+            ):
+                yield item
+                pos = end
+                retry_at = 0
+                continue
+            retry_at = pos + 2 * (len(buffer) - pos)
+
+        if finished:
+            raise ValueError("Unexpected end of json array")
+
+        # Drop the parsed part and read the next chunk
+        buffer = buffer[pos:]
+        retry_at -= pos
+        pos = 0
+        try:
+            buffer += utf8.decode(await stream.__anext__())
+        except StopAsyncIteration:
+            buffer += utf8.decode(b"", final=True)
+            finished = True
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass
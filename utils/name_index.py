@@ -0,0 +1,163 @@
+"""Fuzzy name to id index, trigram candidates ranked with token matches"""
+
+import heapq
+import re
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+_SEPARATORS = re.compile(r"[^\w]+")
+
+# Candidates scoring below this are not returned
+MIN_SCORE = 0.3
+# Names scored per kind, those most similar to the query by trigrams
+CANDIDATES = 20
+# Words that do not count as found or missing
+STOP_WORDS = {"and", "of", "the"}
+
+
+# Class Definitions
+class NameIndex:
+    """Names of one or more kinds (levels, views, ...) and their ids.
+    A kind is replaced as a whole, the way chat memory stores its mappings"""
+
+    def __init__(self):
+        # kind -> the (name, id) pairs indexed
+        self._pairs: Dict[str, List[Tuple[str, Any]]] = {}
+        # kind -> entries of (name, id, normalized, tokens, trigram count)
+        self._entries: Dict[str, List[Tuple[str, Any, str, Set[str], int]]] = {}
+        # kind -> trigram -> positions of the entries containing it
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        # kind -> normalized name -> position of its first entry
+        self._exact: Dict[str, Dict[str, int]] = {}
+
+    def replace(self, kind: str, names: Iterable[Tuple[str, Any]]) -> None:
+        """Indexes the (name, id) pairs of a kind instead of its previous ones.
+        When the previous pairs are the start of the new ones, e.g. after a
+        view was created, only the added pairs are indexed"""
+        pairs = [(name, id) for name, id in names if name is not None]
+        previous = self._pairs.get(kind)
+        if previous is not None and pairs[: len(previous)] == previous:
+            entries = self._entries[kind]
+            postings = self._postings.get(kind, {})
+            exact = self._exact[kind]
+            added = pairs[len(previous) :]
+        else:
+            entries, postings, exact = [], {}, {}
+            added = pairs
+        for name, id in added:
+            normalized = normalize(name)
+            grams = trigrams(normalized)
+            position = len(entries)
+            entries.append(
+                (str(name), id, normalized, set(normalized.split()), len(grams))
+            )
+            exact.setdefault(normalized, position)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self._pairs[kind] = pairs
+        self._entries[kind] = entries
+        self._postings[kind] = postings
+        self._exact[kind] = exact
+
+    def kinds(self) -> List[str]:
+        return list(self._entries)
+
+    def has_kind(self, kind: str) -> bool:
+        return kind in self._entries
+
+    def exact(self, kind: str, name: str) -> Optional[Any]:
+        """Id of the name compared in its normalized form, None when unknown"""
+        position = self._exact.get(kind, {}).get(normalize(name))
+        return None if position is None else self._entries[kind][position][1]
+
+    def search(
+        self,
+        name: str,
+        kinds: Optional[Iterable[str]] = None,
+        limit: int = 5,
+        min_score: float = MIN_SCORE,
+    ) -> List[Dict[str, Any]]:
+        """Ranked {Name, Id, Kind, Score} candidates, best first"""
+        query = normalize(name)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        query_tokens = [t for t in query.split() if t not in STOP_WORDS]
+        query_tokens = query_tokens or query.split()
+        numbers = {t for t in query_tokens if t.isdigit()}
+        gram_total = len(query_grams)
+        matches = []
+        for kind in kinds or self._entries:
+            entries = self._entries.get(kind, [])
+            postings = self._postings.get(kind, {})
+            shared = Counter(
+                chain.from_iterable(postings.get(gram, ()) for gram in query_grams)
+            )
+            # Only the names with the best trigram similarity are scored
+            best = heapq.nlargest(
+                CANDIDATES,
+                shared.items(),
+                key=lambda item: item[1] / (gram_total + entries[item[0]][4]),
+            )
+            for position, count in best:
+                entry_name, id, normalized, tokens, gram_count = entries[position]
+                score = _score(
+                    query,
+                    query_tokens,
+                    numbers,
+                    gram_total,
+                    count,
+                    normalized,
+                    tokens,
+                    gram_count,
+                )
+                if score >= min_score:
+                    matches.append(
+                        {"Name": entry_name, "Id": id, "Kind": kind, "Score": score}
+                    )
+        matches.sort(key=lambda m: m["Score"], reverse=True)
+        return matches[:limit]
+
+
+# Functions
+def normalize(name: str) -> str:
+    """Case, punctuation and '&' insensitive form of a name"""
+    name = str(name).casefold().replace("&", " and ")
+    return " ".join(_SEPARATORS.sub(" ", name).split())
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _score(
+    query: str,
+    query_tokens: List[str],
+    numbers: Set[str],
+    query_gram_count: int,
+    shared: int,
+    normalized: str,
+    tokens: Set[str],
+    gram_count: int,
+) -> float:
+    """Trigram similarity blended with the share of query words found in the
+    name; a number in the query has to be in the name ('level 2' is not 'Level 12')"""
+    if normalized == query:
+        return 1.0
+    similarity = 2 * shared / (query_gram_count + gram_count)
+    found = sum(
+        1
+        for token in query_tokens
+        if token in tokens or any(t.startswith(token) for t in tokens)
+    )
+    score = 0.5 * similarity + 0.5 * found / len(query_tokens)
+    if numbers and not numbers <= tokens:
+        score *= 0.5
+    return round(min(score, 0.99), 3)
+
+
+# Prevent running from this file
+if __name__ == "__main__":
+    pass